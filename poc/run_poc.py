@@ -118,7 +118,11 @@ def run_benchmark():
     """Run correlator benchmark"""
     print("\n[Launching Correlator Benchmark...]\n")
     try:
-        from zero_dsp_correlator import ZeroDSPCorrelator
+        from zero_dsp_correlator import (ZeroDSPCorrelator, benchmark_streaming_kernel,
+                                         benchmark_fft_planning, benchmark_segmented,
+                                         benchmark_code_bank, benchmark_doppler_bank,
+                                         benchmark_sliding, benchmark_channels,
+                                         benchmark_scratch, benchmark_bank_model)
         
         for order in [11, 15, 20]:
             print(f"\n{'='*40}")
@@ -126,6 +130,43 @@ def run_benchmark():
             print('='*40)
             corr = ZeroDSPCorrelator(prbs_order=order, num_lanes=512, mode='fft')
             corr.benchmark(n_iterations=100)
+        
+        benchmark_streaming_kernel(prbs_order=15)
+        benchmark_fft_planning(orders=(11, 15, 20))
+        benchmark_segmented(prbs_order=20)
+        benchmark_code_bank(order=15)
+        benchmark_doppler_bank(prbs_order=15)
+        benchmark_sliding(prbs_order=15)
+        benchmark_channels(prbs_order=15)
+        benchmark_scratch(prbs_order=15)
+        benchmark_bank_model()
+        
+        from cfar_detector import benchmark_cfar
+        benchmark_cfar()
+        
+        from prbs_library import benchmark_prbs
+        benchmark_prbs()
+        
+        from range_doppler import benchmark_range_doppler
+        benchmark_range_doppler()
+        
+        from coherent_integrator import benchmark_coherent_integrator
+        benchmark_coherent_integrator()
+        
+        from scenario import benchmark_scenario
+        benchmark_scenario()
+        
+        from cpi_pipeline import benchmark_pipeline
+        benchmark_pipeline()
+        
+        from iq_recorder import benchmark_replay
+        benchmark_replay()
+        
+        from sc16 import benchmark_sc16
+        benchmark_sc16()
+        
+        from bladerf_radar import benchmark_streaming
+        benchmark_streaming()
     except Exception as e:
         print(f"Error: {e}")
     input("\nPress Enter to continue...")
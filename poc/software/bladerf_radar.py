@@ -13,8 +13,15 @@ Note: This is a TEMPLATE for bladeRF upgrade path.
 """
 
 import numpy as np
+import queue
+import threading
 import time
 
+from scenario import ScenarioGenerator, Target, warm_up_kernel
+from scratch_pool import ScratchPool
+from sc16 import complex_to_sc16, sc16_to_complex
+from cpi_pipeline import LatencyHistogram
+
 try:
     import bladerf
     BLADERF_AVAILABLE = True
@@ -44,6 +51,9 @@ class BladeRFConfig:
     NUM_RANGE_BINS = 512
     CPI_LENGTH = 32768
     
+    # Host buffering
+    RX_RING_BUFFERS = 4      # SC16 receive buffers reused round-robin
+    
     @classmethod
     def print_config(cls):
         print("=" * 60)
@@ -56,6 +66,34 @@ class BladeRFConfig:
         print(f"RX Gain:            {cls.RX_GAIN} dB")
         print("=" * 60)
 
+#=============================================================================
+# SC16 Buffer Ring
+#=============================================================================
+
+class SC16Ring:
+    """
+    Preallocated receive buffers, handed out round-robin
+    
+    Each slot is an interleaved SC16 int16 buffer (2N values, filled by
+    sync_rx) plus a complex64 buffer of N samples for its conversion.
+    A slot is overwritten num_buffers receives later - copy to keep it.
+    """
+    
+    def __init__(self, num_buffers, num_samples):
+        self.num_buffers = num_buffers
+        self.num_samples = num_samples
+        self.raw = np.zeros((num_buffers, 2 * num_samples), dtype=np.int16)
+        self.samples = np.zeros((num_buffers, num_samples), dtype=np.complex64)
+        self.index = 0
+        self.fills = 0
+    
+    def next(self):
+        """(raw, samples) buffers of the next slot"""
+        slot = self.index
+        self.index = (slot + 1) % self.num_buffers
+        self.fills += 1
+        return self.raw[slot], self.samples[slot]
+
 #=============================================================================
 # bladeRF Interface
 #=============================================================================
@@ -72,19 +110,44 @@ class BladeRFRadar:
     - Better oscillator (VCTCXO with 10 MHz ref input)
     """
     
-    def __init__(self, device_identifier="*:serial=*"):
+    def __init__(self, device_identifier="*:serial=*", device=None):
+        """
+        Args:
+            device_identifier: libbladerf device string
+            device: Optional device object used instead of opening
+                    hardware (e.g. FakeBladeRF)
+        """
         self.config = BladeRFConfig
-        self.device = None
-        self.tx_channel = None
-        self.rx_channel = None
+        self.device = device
+        self.tx_channel = None if device is None else device.Channel(1)
+        self.rx_channel = None if device is None else device.Channel(0)
+        self.streamer = None
         self.tx_waveform = None
+        self.tx_sc16 = None
+        self.scenario = self._make_scenario()
         
+        # RX buffer ring (sized on first receive) and TX / simulation work arrays
+        self.rx_ring = None
+        self.scratch = ScratchPool()
+    
+    def _make_scenario(self):
+        """Simulated RX: waveform sent once per receive(), echo at delay 100"""
+        if self.tx_waveform is None:
+            return ScenarioGenerator(None, self.config.SAMPLE_RATE, noise_power=2e-4)
+        return ScenarioGenerator(self.tx_waveform, self.config.SAMPLE_RATE,
+                                 targets=[Target(100, amplitude=0.5)],
+                                 noise_power=2e-4, cyclic=False)
+    
     def connect(self):
         """Connect to bladeRF device"""
+        if self.device is not None:
+            print("[BladeRF] Using attached device")
+            return True
+        
         if not BLADERF_AVAILABLE:
             print("[BladeRF] Module not available - simulation mode")
             return True
-            
+        
         try:
             # Find and open device
             devices = bladerf.get_device_list()
@@ -121,16 +184,16 @@ class BladeRFRadar:
             print(f"[BladeRF] RX configured: {self.config.CENTER_FREQ/1e6:.1f} MHz")
             
             return True
-            
+        
         except Exception as e:
             print(f"[BladeRF] Connection error: {e}")
             return False
     
     def configure_sync(self, num_buffers=16, buffer_size=8192):
         """Configure synchronous interface"""
-        if self.device is None:
+        if self.device is None or not BLADERF_AVAILABLE:
             return
-            
+        
         # Configure TX sync
         self.device.sync_config(
             layout=bladerf.ChannelLayout.TX_X1,
@@ -154,15 +217,17 @@ class BladeRFRadar:
         print("[BladeRF] Sync interface configured")
     
     def set_prbs_waveform(self, waveform):
-        """Set transmit waveform"""
+        """Set transmit waveform (converted to SC16 once, here)"""
         self.tx_waveform = waveform
-        
+        self.tx_sc16 = complex_to_sc16(np.asarray(waveform, dtype=np.complex64))
+        self.scenario = self._make_scenario()
+    
     def start_tx(self):
         """Enable TX"""
         if self.device is None:
             print("[BladeRF] Simulation - TX started")
             return
-            
+        
         self.tx_channel.enable = True
         print("[BladeRF] TX enabled")
     
@@ -170,47 +235,120 @@ class BladeRFRadar:
         """Disable TX"""
         if self.device is None:
             return
-            
+        
         self.tx_channel.enable = False
         print("[BladeRF] TX disabled")
     
-    def transmit(self, samples):
-        """Transmit samples"""
-        if self.device is None:
-            return
-            
-        # Convert to int16 format
-        samples_int = (samples * 2047).astype(np.int16)
-        self.device.sync_tx(samples_int, len(samples_int))
+    def transmit(self, samples=None, repeats=1):
+        """
+        Transmit samples
+        
+        With samples=None the cyclic PRBS buffer prepared by
+        set_prbs_waveform is sent as-is, repeats times, with no per-call
+        conversion or allocation. int16 input is taken as ready SC16;
+        complex input is converted into a reused buffer.
+        
+        Args:
+            samples: None, complex samples or interleaved SC16 int16
+            repeats: Number of times the buffer is sent
+        
+        Returns:
+            The SC16 buffer handed to sync_tx
+        """
+        if samples is None:
+            if self.tx_sc16 is None:
+                raise ValueError("No TX waveform - call set_prbs_waveform first")
+            buf = self.tx_sc16
+        elif samples.dtype == np.int16:
+            buf = samples
+        else:
+            n = len(samples)
+            buf = complex_to_sc16(samples, out=self.scratch.get('tx_sc16', 2 * n, np.int16),
+                                  scratch=self.scratch.get('tx_float', 2 * n, np.float32))
+        
+        if self.device is not None:
+            for _ in range(repeats):
+                self.device.sync_tx(buf, buf.size // 2)
+        
+        return buf
     
-    def receive(self, num_samples):
-        """Receive samples"""
+    def receive_raw(self, num_samples):
+        """
+        Receive into the next ring buffer, without conversion
+        
+        Returns:
+            Interleaved SC16 int16 buffer of 2 * num_samples values (see
+            sc16.iq_view for an [N, 2] I/Q view); reused by the ring
+        """
+        ring = self.rx_ring
+        if ring is None or ring.num_samples != num_samples:
+            ring = self.rx_ring = SC16Ring(self.config.RX_RING_BUFFERS, num_samples)
+        
+        raw, self._rx_samples = ring.next()
+        
         if self.device is None:
             # Simulation mode
-            return self._simulate_rx(num_samples)
-            
-        # Allocate buffer
-        buf = np.zeros(num_samples, dtype=np.int16)
+            self._simulate_rx(num_samples, raw)
+        else:
+            self.rx_channel.enable = True
+            self.device.sync_rx(raw, num_samples)
         
-        # Receive
-        self.rx_channel.enable = True
-        self.device.sync_rx(buf, num_samples)
+        return raw
+    
+    def receive(self, num_samples, out=None):
+        """
+        Receive complex64 samples
+        
+        The SC16 block lands in the RX ring and is converted in one
+        vectorized pass into out, or into the ring slot's complex buffer
+        (reused num_buffers receives later - copy to keep it).
         
-        # Convert to complex float
-        samples = buf.astype(np.float32) / 2047.0
-        return samples
+        Args:
+            num_samples: Complex samples to receive
+            out: Optional complex64 buffer of num_samples
+        """
+        raw = self.receive_raw(num_samples)
+        return sc16_to_complex(raw, self._rx_samples if out is None else out)
     
-    def _simulate_rx(self, num_samples):
-        """Simulate received signal for testing"""
-        # Generate noise + simulated target
-        noise = 0.01 * (np.random.randn(num_samples) + 1j * np.random.randn(num_samples))
+    def stream(self, num_samples=None, queue_depth=8, max_buffers=None,
+               policy='drop_oldest', timeout=5.0):
+        """
+        Background-streamed RX blocks (see RXStreamer)
+        
+        Without a device, a FakeBladeRF paced at SAMPLE_RATE plays
+        self.scenario. The worker stops when the generator is closed;
+        self.streamer keeps the counters and latencies.
+        
+        Args:
+            num_samples: Samples per block (default: CPI_LENGTH)
+            queue_depth: Maximum queued blocks
+            max_buffers: Stop after this many blocks (None = endless)
+            policy: 'drop_oldest' or 'drop_newest' when the queue is full
+            timeout: Seconds without a block before TimeoutError
         
-        # Add delayed copy of TX waveform if available
-        if self.tx_waveform is not None and len(self.tx_waveform) < num_samples:
-            delay = 100
-            noise[delay:delay+len(self.tx_waveform)] += 0.5 * self.tx_waveform
+        Yields:
+            StreamBlock (views recycled on the next iteration)
+        """
+        device = self.device
+        if device is None:
+            device = FakeBladeRF(self.config.SAMPLE_RATE, scenario=self.scenario)
         
-        return noise.astype(np.complex64)
+        self.streamer = RXStreamer(device, num_samples or self.config.CPI_LENGTH,
+                                   queue_depth=queue_depth, policy=policy)
+        if self.rx_channel is not None:
+            self.rx_channel.enable = True
+        try:
+            yield from self.streamer.stream(max_buffers=max_buffers, timeout=timeout)
+        finally:
+            self.streamer.stop()
+    
+    def _simulate_rx(self, num_samples, out):
+        """Simulated SC16 block (self.scenario, quantized like the ADC)"""
+        samples = self.scratch.get('sim_rx', num_samples, np.complex64)
+        self.scenario.generate(samples)
+        complex_to_sc16(samples, out=out,
+                        scratch=self.scratch.get('sim_float', 2 * num_samples, np.float32))
+        return out
     
     def close(self):
         """Close device"""
@@ -219,6 +357,360 @@ class BladeRFRadar:
             self.device.close()
             print("[BladeRF] Device closed")
 
+#=============================================================================
+# Fake Device (CI stand-in)
+#=============================================================================
+
+class _FakeChannel:
+    """Attribute holder standing in for bladerf Channel objects"""
+    
+    def __init__(self):
+        self.frequency = 0
+        self.sample_rate = 0
+        self.bandwidth = 0
+        self.gain = 0
+        self.enable = False
+
+class FakeBladeRF:
+    """
+    Local stand-in for a bladerf.BladeRF device
+    
+    sync_rx() delivers SC16 samples at sample_rate on an absolute
+    schedule, as if from the RX FIFO: a caller that falls more than
+    fifo_samples behind loses the oldest samples (overrun). rx_timestamp
+    is the sample counter of the first sample of the last buffer, like
+    the libbladerf metadata timestamp, so gaps are visible downstream.
+    Samples come from a scenario, or from a fixed noise block when
+    scenario is None (cheap, for throughput tests).
+    """
+    
+    def __init__(self, sample_rate=BladeRFConfig.SAMPLE_RATE, scenario=None,
+                 fifo_samples=16 * 8192, seed=0):
+        """
+        Args:
+            sample_rate: Samples per second, None = as fast as read
+            scenario: Optional ScenarioGenerator for the RX content
+            fifo_samples: Device-side buffering before an overrun
+            seed: Seed for the fixed noise block
+        """
+        self.sample_rate = sample_rate
+        self.scenario = scenario
+        self.fifo_samples = fifo_samples
+        self.rng = np.random.default_rng(seed)
+        self.scratch = ScratchPool()
+        if scenario is not None:
+            warm_up_kernel()
+        
+        self.sample_index = 0
+        self.rx_timestamp = 0
+        self.rx_overruns = 0
+        self.tx_samples = 0
+        self._noise = None
+        self._t0 = None
+        self._gap = 0
+        self._lock = threading.Lock()
+    
+    def Channel(self, channel):
+        return _FakeChannel()
+    
+    def sync_config(self, **kwargs):
+        self.sync_settings = kwargs
+    
+    def drop_samples(self, count):
+        """
+        Simulate a hardware overrun: the next buffer starts count samples later
+        
+        Safe to call from another thread than sync_rx(); the gap is
+        applied at the start of the next sync_rx().
+        """
+        with self._lock:
+            self._gap += count
+    
+    def sync_rx(self, buf, num_samples, timeout_ms=3500):
+        """Fill buf (2 * num_samples int16) with the next SC16 block"""
+        with self._lock:
+            gap, self._gap = self._gap, 0
+        if gap:
+            # Lost samples, not a pause: the sample clock moves on with them
+            self.sample_index += gap
+            self.rx_overruns += 1
+            if self._t0 is not None and self.sample_rate:
+                self._t0 -= gap / self.sample_rate
+        
+        if self.sample_rate and self._t0 is not None:
+            now = time.perf_counter()
+            
+            # Samples older than the FIFO depth are gone
+            available = int((now - self._t0) * self.sample_rate)
+            if available - self.sample_index > self.fifo_samples:
+                self.sample_index = available - self.fifo_samples
+                self.rx_overruns += 1
+            
+            ready = self._t0 + (self.sample_index + num_samples) / self.sample_rate
+            if ready - now > timeout_ms / 1e3:
+                raise TimeoutError("sync_rx timed out")
+            if ready > now:
+                time.sleep(ready - now)
+        
+        raw = buf[:2 * num_samples]
+        if self.scenario is not None:
+            samples = self.scratch.get('rx', num_samples, np.complex64)
+            self.scenario.generate(samples)
+            complex_to_sc16(samples, out=raw,
+                            scratch=self.scratch.get('rx_float', 2 * num_samples, np.float32))
+        else:
+            if self._noise is None or self._noise.size != raw.size:
+                self._noise = self.rng.integers(-64, 64, raw.size).astype(np.int16)
+            np.copyto(raw, self._noise)
+        
+        self.rx_timestamp = self.sample_index
+        self.sample_index += num_samples
+        
+        # The sample clock starts with the first delivered block
+        if self.sample_rate and self._t0 is None:
+            self._t0 = time.perf_counter() - self.sample_index / self.sample_rate
+    
+    def sync_tx(self, buf, num_samples, timeout_ms=3500):
+        self.tx_samples += num_samples
+    
+    def close(self):
+        pass
+
+#=============================================================================
+# Background RX Streaming
+#=============================================================================
+
+class StreamBlock:
+    """One received buffer handed out by RXStreamer.stream()"""
+    
+    def __init__(self, seq, samples, raw, timestamp, host_time):
+        self.seq = seq                # Buffer number since start (drops included)
+        self.samples = samples        # complex64 view into the slot
+        self.raw = raw                # SC16 int16 view into the slot
+        self.timestamp = timestamp    # Device sample counter (None if unknown)
+        self.host_time = host_time    # time.perf_counter() when sync_rx returned
+
+class RXStreamer:
+    """
+    Background sync_rx worker with a bounded queue
+    
+    A thread keeps calling sync_rx into preallocated slots (queue_depth
+    + 2: one filling, one held by the consumer), converts each block to
+    complex64 and queues it. When the consumer falls behind the queue
+    stays bounded: 'drop_oldest' discards the stalest queued block,
+    'drop_newest' the one just received. The device is read either way,
+    so its FIFO does not overrun because of a slow consumer.
+    
+    Accounting (stats()):
+        received   - buffers returned by sync_rx
+        delivered  - buffers yielded by stream()
+        dropped    - buffers discarded because the queue was full
+        overflows  - device timestamp gaps (hardware overrun)
+        lost       - samples missing in those gaps
+        errors     - sync_rx exceptions (timeouts)
+        timestamps - whether the device reports per-buffer timestamps
+    
+    Timestamps and overflow accounting need a device that exposes the
+    sample counter of the last sync_rx as rx_timestamp (FakeBladeRF).
+    The bladerf Python bindings do not return sync_rx metadata, so on
+    hardware StreamBlock.timestamp is None, overflows stay 0 and
+    stats()['timestamps'] is False; a warning is printed on start().
+    """
+    
+    def __init__(self, device, num_samples, queue_depth=8, policy='drop_oldest',
+                 timeout_ms=3500):
+        """
+        Args:
+            device: bladerf.BladeRF (configured for sync RX) or FakeBladeRF
+            num_samples: Samples per buffer
+            queue_depth: Maximum queued buffers
+            policy: 'drop_oldest' or 'drop_newest'
+            timeout_ms: sync_rx timeout
+        """
+        if policy not in ('drop_oldest', 'drop_newest'):
+            raise ValueError(f"Unknown policy '{policy}', choose 'drop_oldest' or 'drop_newest'")
+        if queue_depth < 1:
+            raise ValueError(f"queue_depth must be >= 1, got {queue_depth}")
+        
+        self.device = device
+        self.num_samples = num_samples
+        self.queue_depth = queue_depth
+        self.policy = policy
+        self.timeout_ms = timeout_ms
+        self.timestamps = hasattr(device, 'rx_timestamp')
+        
+        num_slots = queue_depth + 2
+        self.buffers = SC16Ring(num_slots, num_samples)
+        self._seq = np.zeros(num_slots, dtype=np.int64)
+        self._timestamp = np.zeros(num_slots, dtype=np.int64)
+        self._host_time = np.zeros(num_slots)
+        
+        self._thread = None
+        self._stop = threading.Event()
+        self.last_error = None
+        self._reset()
+    
+    def _reset(self):
+        self.counters = dict.fromkeys(
+            ('received', 'delivered', 'dropped', 'overflows', 'lost', 'errors', 'max_queued'), 0)
+        self.latency = {stage: LatencyHistogram(stage) for stage in ('read', 'queue')}
+        self._free = queue.Queue()
+        for slot in range(self.buffers.num_buffers):
+            self._free.put(slot)
+        self._full = queue.Queue(maxsize=self.queue_depth)
+        self._next_timestamp = None
+        self._started = self._stopped = None
+    
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self):
+        """Start the background worker (counters are reset)"""
+        if self.running:
+            return
+        self._reset()
+        if not self.timestamps:
+            print("[RXStreamer] Device reports no RX timestamps - overflows are not detected")
+        self._stop.clear()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._worker, name='bladerf-rx', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop the worker after its current sync_rx"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._started is not None and self._stopped is None:
+            self._stopped = time.perf_counter()
+    
+    def _worker(self):
+        n = self.num_samples
+        seq = 0
+        
+        while not self._stop.is_set():
+            slot = self._free.get()
+            raw = self.buffers.raw[slot]
+            
+            start = time.perf_counter()
+            try:
+                self.device.sync_rx(raw, n, timeout_ms=self.timeout_ms)
+            except Exception as e:
+                self.counters['errors'] += 1
+                self.last_error = e
+                self._free.put(slot)
+                continue
+            host_time = time.perf_counter()
+            self.latency['read'].record(host_time - start)
+            
+            # Device timestamps expose hardware overruns as gaps
+            timestamp = self.device.rx_timestamp if self.timestamps else None
+            if timestamp is not None:
+                if self._next_timestamp is not None and timestamp != self._next_timestamp:
+                    self.counters['overflows'] += 1
+                    self.counters['lost'] += timestamp - self._next_timestamp
+                self._next_timestamp = timestamp + n
+            
+            sc16_to_complex(raw, self.buffers.samples[slot])
+            self._seq[slot] = seq
+            self._timestamp[slot] = -1 if timestamp is None else timestamp
+            self._host_time[slot] = host_time
+            self.counters['received'] += 1
+            seq += 1
+            
+            self._enqueue(slot)
+    
+    def _enqueue(self, slot):
+        """Queue a filled slot, dropping per policy when full"""
+        try:
+            self._full.put_nowait(slot)
+        except queue.Full:
+            if self.policy == 'drop_newest':
+                self.counters['dropped'] += 1
+                self._free.put(slot)
+                return
+            # The consumer may take the oldest block first - then nothing is lost
+            try:
+                self._free.put(self._full.get_nowait())
+                self.counters['dropped'] += 1
+            except queue.Empty:
+                pass
+            self._full.put_nowait(slot)
+        
+        self.counters['max_queued'] = max(self.counters['max_queued'], self._full.qsize())
+    
+    def stream(self, max_buffers=None, timeout=5.0):
+        """
+        Iterate over received buffers (starts the worker if needed)
+        
+        Each StreamBlock views a slot that is recycled when the next
+        block is requested - copy samples to keep them.
+        
+        Args:
+            max_buffers: Stop after this many blocks (None = until stop())
+            timeout: Seconds without a block before TimeoutError
+        
+        Yields:
+            StreamBlock
+        """
+        if not self.running:
+            self.start()
+        
+        held = None
+        count = 0
+        try:
+            while max_buffers is None or count < max_buffers:
+                if held is not None:
+                    self._free.put(held)
+                    held = None
+                
+                deadline = time.perf_counter() + timeout
+                while held is None:
+                    try:
+                        held = self._full.get(timeout=0.05)
+                    except queue.Empty:
+                        if not self.running:
+                            return
+                        if time.perf_counter() > deadline:
+                            raise TimeoutError(f"No RX buffer within {timeout} s "
+                                               f"(last error: {self.last_error})")
+                
+                now = time.perf_counter()
+                self.latency['queue'].record(now - self._host_time[held])
+                self.counters['delivered'] += 1
+                count += 1
+                
+                timestamp = int(self._timestamp[held])
+                yield StreamBlock(int(self._seq[held]), self.buffers.samples[held],
+                                  self.buffers.raw[held], None if timestamp < 0 else timestamp,
+                                  self._host_time[held])
+        finally:
+            if held is not None:
+                self._free.put(held)
+    
+    def stats(self):
+        """Counters, queued buffers, MS/s delivered and latency summaries"""
+        stats = dict(self.counters)
+        end = self._stopped or time.perf_counter()
+        elapsed = end - self._started if self._started else 0.0
+        stats['queued'] = self._full.qsize()
+        stats['timestamps'] = self.timestamps
+        stats['elapsed'] = elapsed
+        stats['msps'] = (self.counters['delivered'] * self.num_samples / elapsed / 1e6
+                         if elapsed else 0.0)
+        stats['latency'] = {name: hist.summary() for name, hist in self.latency.items()}
+        return stats
+    
+    def print_stats(self):
+        s = self.stats()
+        print(f"[RXStreamer] {s['received']} received, {s['delivered']} delivered, "
+              f"{s['dropped']} dropped, {s['overflows']} overflows ({s['lost']} samples), "
+              f"{s['errors']} errors, {s['msps']:.1f} MS/s")
+        for name, h in s['latency'].items():
+            print(f"  {name:<6} mean {h['mean'] * 1e3:.2f} ms, p99 {h['p99'] * 1e3:.2f} ms, "
+                  f"max {h['max'] * 1e3:.2f} ms")
+
 #=============================================================================
 # FPGA Correlator Interface (Future)
 #=============================================================================
@@ -239,28 +731,70 @@ class BladeRFFPGACorrelator:
     def __init__(self, device):
         self.device = device
         self.fpga_loaded = False
-        
+    
     def load_correlator_bitstream(self, bitstream_path):
         """Load custom correlator FPGA image"""
         # Would load custom bitstream with correlator
         print(f"[FPGA] Would load: {bitstream_path}")
         self.fpga_loaded = True
-        
+    
     def configure_prbs(self, order=15):
         """Configure PRBS generator in FPGA"""
         # Write to FPGA registers
         pass
-        
+    
     def read_range_profile(self):
         """Read processed range profile from FPGA"""
         # Read from FPGA memory
         pass
-        
+    
     def read_detections(self):
         """Read CFAR detections from FPGA"""
         # Read detection FIFO
         pass
 
+#=============================================================================
+# Benchmark
+#=============================================================================
+
+def benchmark_streaming(buffer_sizes=(8192, 65536), num_buffers=200, queue_depth=8):
+    """
+    RXStreamer throughput vs a blocking sync_rx loop (unpaced FakeBladeRF)
+    
+    The consumer touches every sample of every block in both cases.
+    
+    Returns:
+        Dict {num_samples: (blocking MS/s, streamed MS/s, queue p99 ms, dropped)}
+    """
+    results = {}
+    
+    print(f"\n[Benchmark] bladeRF RX streaming ({num_buffers} buffers, queue {queue_depth})")
+    print(f"  {'Samples':>8} {'blocking':>10} {'streamed':>10} {'queue p99':>10} {'dropped':>8}")
+    
+    for n in buffer_sizes:
+        raw = np.empty(2 * n, dtype=np.int16)
+        samples = np.empty(n, dtype=np.complex64)
+        device = FakeBladeRF(sample_rate=None)
+        
+        start = time.perf_counter()
+        for _ in range(num_buffers):
+            device.sync_rx(raw, n)
+            float(sc16_to_complex(raw, samples).view(np.float32).sum())
+        blocking = n * num_buffers / (time.perf_counter() - start) / 1e6
+        
+        streamer = RXStreamer(FakeBladeRF(sample_rate=None), n, queue_depth=queue_depth)
+        for block in streamer.stream(max_buffers=num_buffers):
+            float(block.samples.view(np.float32).sum())
+        streamer.stop()
+        stats = streamer.stats()
+        p99 = stats['latency']['queue']['p99'] * 1e3
+        
+        results[n] = (blocking, stats['msps'], p99, stats['dropped'])
+        print(f"  {n:>8} {blocking:>5.1f} MS/s {stats['msps']:>5.1f} MS/s "
+              f"{p99:>7.2f} ms {stats['dropped']:>8}")
+    
+    return results
+
 #=============================================================================
 # Demo
 #=============================================================================
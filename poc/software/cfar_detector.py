@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+QEDMMA PoC - Vectorized CFAR Detectors
+Sliding-window CA / GO / SO / OS CFAR for range profiles
+
+Author: Dr. Mladen Mešter
+Copyright (c) 2026 - All Rights Reserved
+
+Window layout for cell i (same edge handling for every variant):
+    leading:  profile[max(0, i-G-R) : max(0, i-G)]
+    lagging:  profile[min(n, i+G+1) : min(n, i+G+R+1)]
+
+Cells near the edges simply use fewer reference cells. If no reference
+cell exists at all, the median of the whole profile is the noise
+estimate. CA/GO/SO use prefix sums (O(N)); OS partitions blocks of
+windows (O(N*R)).
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from math import comb
+from functools import lru_cache
+import time
+
+# Rows per OS-CFAR partition block (bounds working memory at 1M bins)
+OS_BLOCK_ROWS = 65536
+
+#=============================================================================
+# CFAR Constants
+#=============================================================================
+
+def _solve_alpha(pfa_of_alpha, pfa):
+    """Bisection for the threshold multiplier giving the requested Pfa"""
+    lo, hi = 0.0, 1.0
+    while pfa_of_alpha(hi) > pfa:
+        hi *= 2.0
+        if hi > 1e12:
+            raise ValueError(f"Pfa {pfa} not reachable")
+    
+    for _ in range(200):
+        mid = 0.5 * (lo + hi)
+        if pfa_of_alpha(mid) > pfa:
+            lo = mid
+        else:
+            hi = mid
+    
+    return hi
+
+def alpha_ca(ref_cells, pfa):
+    """
+    CA-CFAR constant (Swerling I, square-law)
+    
+    alpha = N * (Pfa^(-1/N) - 1) where N = 2*ref_cells
+    """
+    N = 2 * ref_cells
+    return N * (pfa ** (-1/N) - 1)
+
+def _so_sum(t, n):
+    """sum_k C(n-1+k, k) (2+t)^-(n+k), shared by GO and SO Pfa"""
+    return sum(comb(n - 1 + k, k) * (2.0 + t) ** -(n + k) for k in range(n))
+
+@lru_cache(maxsize=None)
+def alpha_go(ref_cells, pfa):
+    """
+    GO-CFAR constant on the larger half-window mean
+    
+    Pfa = 2(1+t)^-n - 2 * sum_k C(n-1+k, k)(2+t)^-(n+k), alpha = n*t
+    """
+    n = ref_cells
+    t = _solve_alpha(lambda t: 2 * (1 + t) ** -n - 2 * _so_sum(t, n), pfa)
+    return n * t
+
+@lru_cache(maxsize=None)
+def alpha_so(ref_cells, pfa):
+    """
+    SO-CFAR constant on the smaller half-window mean
+    
+    Pfa = 2 * sum_k C(n-1+k, k)(2+t)^-(n+k), alpha = n*t
+    """
+    n = ref_cells
+    t = _solve_alpha(lambda t: 2 * _so_sum(t, n), pfa)
+    return n * t
+
+@lru_cache(maxsize=None)
+def alpha_os(ref_cells, pfa, k):
+    """
+    OS-CFAR constant on the k-th smallest of N = 2*ref_cells cells
+    
+    Pfa = prod_{i=0}^{k-1} (N-i) / (N-i+alpha)
+    """
+    N = 2 * ref_cells
+    
+    def pfa_of_alpha(alpha):
+        return np.prod([(N - i) / (N - i + alpha) for i in range(k)])
+    
+    return _solve_alpha(pfa_of_alpha, pfa)
+
+#=============================================================================
+# Window Sums
+#=============================================================================
+
+def _window_bounds(n, guard_cells, ref_cells):
+    """Leading / lagging [start, end) indices for every cell"""
+    idx = np.arange(n)
+    lead_start = np.maximum(0, idx - guard_cells - ref_cells)
+    lead_end = np.maximum(0, idx - guard_cells)
+    lag_start = np.minimum(n, idx + guard_cells + 1)
+    lag_end = np.minimum(n, idx + guard_cells + ref_cells + 1)
+    return lead_start, lead_end, lag_start, lag_end
+
+def _half_window_means(range_profile, guard_cells, ref_cells):
+    """
+    Prefix-sum leading / lagging window sums and cell counts
+    
+    Returns:
+        (lead_sum, lead_count, lag_sum, lag_count)
+    """
+    n = len(range_profile)
+    
+    # float64 prefix sums: float32 cumsum over 1M cells drifts
+    csum = np.zeros(n + 1, dtype=np.float64)
+    np.cumsum(range_profile, out=csum[1:])
+    
+    lead_start, lead_end, lag_start, lag_end = _window_bounds(n, guard_cells, ref_cells)
+    
+    lead_sum = csum[lead_end] - csum[lead_start]
+    lag_sum = csum[lag_end] - csum[lag_start]
+    
+    return lead_sum, lead_end - lead_start, lag_sum, lag_end - lag_start
+
+def _threshold_dtype(range_profile):
+    """float32 profiles keep float32 thresholds"""
+    return np.result_type(range_profile.dtype, np.float32)
+
+def _finish(range_profile, noise_est, alpha, empty):
+    """Apply alpha, median fallback where no reference cell exists"""
+    if np.any(empty):
+        noise_est[empty] = np.median(range_profile)
+    
+    threshold = (alpha * noise_est).astype(_threshold_dtype(range_profile))
+    detections = range_profile > threshold
+    
+    return detections, threshold
+
+#=============================================================================
+# CFAR Detectors
+#=============================================================================
+
+def cfar_ca(range_profile, guard_cells=4, ref_cells=16, pfa=1e-4):
+    """
+    Cell-Averaging CFAR detector
+    
+    Args:
+        range_profile: Input range profile (magnitudes)
+        guard_cells: Guard cells on each side
+        ref_cells: Reference cells on each side
+        pfa: Probability of false alarm
+    
+    Returns:
+        detections: Boolean array of detections
+        threshold: Adaptive threshold array
+    """
+    range_profile = np.asarray(range_profile)
+    lead_sum, lead_n, lag_sum, lag_n = _half_window_means(
+        range_profile, guard_cells, ref_cells
+    )
+    
+    count = lead_n + lag_n
+    empty = count == 0
+    noise_est = (lead_sum + lag_sum) / np.maximum(count, 1)
+    
+    return _finish(range_profile, noise_est, alpha_ca(ref_cells, pfa), empty)
+
+def cfar_go(range_profile, guard_cells=4, ref_cells=16, pfa=1e-4):
+    """
+    Greatest-Of CFAR detector (robust at clutter edges)
+    
+    Noise estimate is the larger of the leading / lagging means. At the
+    profile edges, where one side is empty, the other side is used.
+    Arguments and returns as cfar_ca.
+    """
+    range_profile = np.asarray(range_profile)
+    lead_sum, lead_n, lag_sum, lag_n = _half_window_means(
+        range_profile, guard_cells, ref_cells
+    )
+    
+    lead_mean = np.where(lead_n > 0, lead_sum / np.maximum(lead_n, 1), -np.inf)
+    lag_mean = np.where(lag_n > 0, lag_sum / np.maximum(lag_n, 1), -np.inf)
+    
+    empty = (lead_n + lag_n) == 0
+    noise_est = np.maximum(lead_mean, lag_mean)
+    
+    return _finish(range_profile, noise_est, alpha_go(ref_cells, pfa), empty)
+
+def cfar_so(range_profile, guard_cells=4, ref_cells=16, pfa=1e-4):
+    """
+    Smallest-Of CFAR detector (resolves closely spaced targets)
+    
+    Noise estimate is the smaller of the leading / lagging means. At the
+    profile edges, where one side is empty, the other side is used.
+    Arguments and returns as cfar_ca.
+    """
+    range_profile = np.asarray(range_profile)
+    lead_sum, lead_n, lag_sum, lag_n = _half_window_means(
+        range_profile, guard_cells, ref_cells
+    )
+    
+    lead_mean = np.where(lead_n > 0, lead_sum / np.maximum(lead_n, 1), np.inf)
+    lag_mean = np.where(lag_n > 0, lag_sum / np.maximum(lag_n, 1), np.inf)
+    
+    empty = (lead_n + lag_n) == 0
+    noise_est = np.minimum(lead_mean, lag_mean)
+    
+    return _finish(range_profile, noise_est, alpha_so(ref_cells, pfa), empty)
+
+def cfar_os(range_profile, guard_cells=4, ref_cells=16, pfa=1e-4, k=None):
+    """
+    Ordered-Statistic CFAR detector (robust to interfering targets)
+    
+    Noise estimate is the k-th smallest reference cell. Interior cells
+    are handled as blocks of partitioned windows; edge cells with fewer
+    reference cells use the same rank scaled to the cells available.
+    
+    Args:
+        k: Rank among the 2*ref_cells cells (default: 3/4 * 2*ref_cells)
+    
+    Other arguments and returns as cfar_ca.
+    """
+    range_profile = np.asarray(range_profile)
+    n = len(range_profile)
+    N = 2 * ref_cells
+    if k is None:
+        k = (3 * N) // 4
+    if not 1 <= k <= N:
+        raise ValueError(f"OS-CFAR rank k must be in [1, {N}], got {k}")
+    
+    noise_est = np.empty(n, dtype=np.float64)
+    empty = np.zeros(n, dtype=bool)
+    
+    # Interior: both half windows complete
+    span = guard_cells + ref_cells
+    first, last = span, n - span  # cells [first, last)
+    
+    if last > first:
+        windows = sliding_window_view(range_profile, 2 * span + 1)
+        for start in range(0, last - first, OS_BLOCK_ROWS):
+            block = windows[start:min(start + OS_BLOCK_ROWS, last - first)]
+            cells = np.concatenate([block[:, :ref_cells],
+                                    block[:, -ref_cells:]], axis=1)
+            cells.partition(k - 1, axis=1)
+            noise_est[first + start:first + start + len(block)] = cells[:, k - 1]
+    
+    # Edges: truncated windows, rank scaled to the available cells
+    lead_start, lead_end, lag_start, lag_end = _window_bounds(n, guard_cells, ref_cells)
+    edge_cells = np.r_[0:min(first, n), max(last, first, 0):n]
+    
+    for i in edge_cells:
+        cells = np.concatenate([range_profile[lead_start[i]:lead_end[i]],
+                                range_profile[lag_start[i]:lag_end[i]]])
+        if len(cells) == 0:
+            empty[i] = True
+            continue
+        rank = max(1, min(len(cells), int(round(k * len(cells) / N))))
+        noise_est[i] = np.partition(cells, rank - 1)[rank - 1]
+    
+    return _finish(range_profile, noise_est, alpha_os(ref_cells, pfa, k), empty)
+
+CFAR_DETECTORS = {
+    'ca': cfar_ca,
+    'go': cfar_go,
+    'so': cfar_so,
+    'os': cfar_os,
+}
+
+def run_cfar(range_profile, cfar='ca', **kwargs):
+    """
+    Run the selected CFAR variant
+    
+    Args:
+        range_profile: Input range profile (magnitudes)
+        cfar: 'ca', 'go', 'so' or 'os'
+        **kwargs: guard_cells, ref_cells, pfa (and k for 'os')
+    
+    Returns:
+        detections, threshold
+    """
+    if cfar not in CFAR_DETECTORS:
+        raise ValueError(f"Unknown CFAR '{cfar}', choose from {sorted(CFAR_DETECTORS)}")
+    return CFAR_DETECTORS[cfar](range_profile, **kwargs)
+
+#=============================================================================
+# Benchmark
+#=============================================================================
+
+def benchmark_cfar(sizes=(512, 32768, 1048576), n_iterations=3):
+    """
+    CFAR throughput per variant and profile length
+    
+    Returns:
+        Dict {(variant, size): Mbins/s}
+    """
+    results = {}
+    
+    print("\n[Benchmark] CFAR throughput (Mbins/s)")
+    print(f"  {'Bins':>9}" + "".join(f"{name.upper():>9}" for name in CFAR_DETECTORS))
+    
+    for size in sizes:
+        profile = np.abs(np.random.randn(size))
+        row = ""
+        
+        for name, detector in CFAR_DETECTORS.items():
+            detector(profile)
+            start = time.perf_counter()
+            for _ in range(n_iterations):
+                detector(profile)
+            elapsed = (time.perf_counter() - start) / n_iterations
+            
+            results[(name, size)] = size / elapsed / 1e6
+            row += f"{results[(name, size)]:9.1f}"
+        
+        print(f"  {size:>9,}{row}")
+    
+    return results
+
+if __name__ == "__main__":
+    benchmark_cfar()
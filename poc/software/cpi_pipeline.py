@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+QEDMMA PoC - Pipelined CPI Capture / Processing
+Double-buffered run mode for PlutoRadar
+
+Author: Dr. Mladen Mešter
+Copyright (c) 2026 - All Rights Reserved
+
+The serial loop (capture -> correlate -> print -> sleep) leaves the SDR
+idle while a CPI is processed. Here the stages run concurrently:
+
+    capture thread --> [slot ring] --> worker thread(s) --> consumer thread
+         ^                                                        |
+         +---------------------- free slots <---------------------+
+
+Every CPI lives in one slot of a preallocated ring (complex64 RX buffer
+plus complex64 range profile) from capture until the consumer has used
+it, so the steady state allocates nothing. Each worker owns its own
+correlator (scratch pools are not shared between threads); numpy's FFT
+and ufunc kernels release the GIL, so workers overlap with capture.
+
+The capture side never waits: when no slot is free the CPI is still
+read (the SDR keeps streaming) into a discard buffer and counted as an
+overrun. A worker that finds no captured CPI waiting counts an idle
+wait - normal whenever processing keeps up with the source, so it is a
+utilisation figure, not an error; lost CPIs show up as overruns.
+Source starvation is tracked separately: reads are expected on an
+absolute schedule at the CPI rate, and a read that completes more than
+one CPI period behind it counts as an underrun.
+The consumer restores capture order before the range-Doppler ring and
+running mean see a profile.
+"""
+
+import numpy as np
+import queue
+import threading
+import time
+
+#=============================================================================
+# Latency Histogram
+#=============================================================================
+
+class LatencyHistogram:
+    """
+    Log2-bucketed latency histogram (1 us .. ~33 s)
+    
+    Bucket k counts latencies in [2^(k-1), 2^k) us (bucket 0: < 1 us).
+    Safe to record from several threads.
+    """
+    
+    NUM_BUCKETS = 26
+    
+    def __init__(self, name):
+        self.name = name
+        self.counts = np.zeros(self.NUM_BUCKETS, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+    
+    def record(self, seconds):
+        """Add one latency sample (seconds)"""
+        us = seconds * 1e6
+        bucket = min(int(us).bit_length(), self.NUM_BUCKETS - 1)
+        with self._lock:
+            self.counts[bucket] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+    
+    @property
+    def mean(self):
+        """Mean latency in seconds"""
+        return self.total / self.count if self.count else 0.0
+    
+    def percentile(self, p):
+        """Upper bucket edge (seconds) below which p percent of samples fall"""
+        if not self.count:
+            return 0.0
+        rank = np.searchsorted(np.cumsum(self.counts), p / 100 * self.count)
+        return min(2.0 ** int(rank) * 1e-6, self.max)
+    
+    def summary(self):
+        """Dict with count, mean, p50, p99 and max (seconds)"""
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'p50': self.percentile(50),
+            'p99': self.percentile(99),
+            'max': self.max,
+        }
+
+#=============================================================================
+# Simulated Source
+#=============================================================================
+
+class SimulatedSource:
+    """
+    Stand-in for the SDR RX stream
+    
+    read(out) fills out with the radar's simulated CPI. With a rate the
+    reads are paced on an absolute schedule, like samples arriving from
+    hardware: a late reader is not given extra time. rate=None delivers
+    CPIs as fast as they are read (maximum load).
+    """
+    
+    def __init__(self, radar, rate=None):
+        """
+        Args:
+            radar: PlutoRadar (provides _simulate_rx)
+            rate: CPIs per second (e.g. RadarConfig.CPI_RATE) or None
+        """
+        self.radar = radar
+        self.rate = rate
+        self._next = None
+    
+    def read(self, out):
+        """Fill out with the next CPI, blocking until it is due"""
+        if self.rate:
+            now = time.perf_counter()
+            if self._next is None:
+                self._next = now
+            self._next += 1.0 / self.rate
+            if self._next > now:
+                time.sleep(self._next - now)
+        
+        self.radar._simulate_rx(out=out)
+        return out
+
+#=============================================================================
+# CPI Pipeline
+#=============================================================================
+
+class CPIPipeline:
+    """
+    Capture / process / consume pipeline over a preallocated slot ring
+    
+    Counters (self.counters):
+        captured   - CPIs read from the source
+        overruns   - CPIs dropped because every slot was busy
+        idle_waits - times a worker found no captured CPI waiting
+        underruns  - source reads completing over one CPI period late
+        processed  - CPIs correlated
+        consumed   - CPIs handed to the consumer, in capture order
+    
+    Latency histograms (self.latency): 'capture' (source read), 'queue'
+    (captured -> worker start), 'process' (correlation), 'consume'
+    (range-Doppler push, mean, detection, callback) and 'end_to_end'
+    (captured -> consumed).
+    """
+    
+    STAGES = ('capture', 'queue', 'process', 'consume', 'end_to_end')
+    
+    def __init__(self, radar, source=None, num_buffers=4, workers=1,
+                 consumer=None, rd_callback=None, cpi_rate=None):
+        """
+        Initialize pipeline
+        
+        Args:
+            radar: PlutoRadar (config, correlators, range-Doppler stage)
+            source: Callable source(out) filling a CPI buffer; default
+                    radar.capture_cpi (SDR, or unpaced simulation)
+            num_buffers: Slots in the ring (>= 2)
+            workers: Correlation worker threads
+            consumer: Optional callback(cpi_idx, range_profile, detections)
+                      (range_profile is reused - copy to keep it)
+            rd_callback: Optional callback(cpi_idx, rd_map) once the
+                         range-Doppler ring is full (rd_map is reused)
+            cpi_rate: Expected source CPIs per second for underrun
+                      accounting (default config.CPI_RATE, 0 = off)
+        """
+        if num_buffers < 2:
+            raise ValueError(f"Need at least 2 buffers, got {num_buffers}")
+        if workers < 1:
+            raise ValueError(f"Need at least 1 worker, got {workers}")
+        
+        config = radar.config
+        self.radar = radar
+        self.source = source if source is not None else radar.capture_cpi
+        self.num_buffers = num_buffers
+        self.num_workers = workers
+        self.consumer = consumer
+        self.rd_callback = rd_callback
+        self.cpi_rate = config.CPI_RATE if cpi_rate is None else cpi_rate
+        
+        # Slot ring (RX block + complex profile) and per-slot metadata
+        num_bins = config.NUM_RANGE_BINS
+        self._rx = np.zeros((num_buffers, config.CPI_LENGTH), dtype=np.complex64)
+        self._profiles = np.zeros((num_buffers, num_bins), dtype=np.complex64)
+        self._discard = np.zeros(config.CPI_LENGTH, dtype=np.complex64)
+        self._t_captured = np.zeros(num_buffers)
+        
+        # Consumer-side buffers
+        self.avg_profile = np.zeros(num_bins)
+        self._range_profile = np.zeros(num_bins, dtype=np.float32)
+        self._delta = np.zeros(num_bins)
+        
+        # Worker 0 reuses the radar's correlator, others get their own
+        self._correlators = [radar.correlator] + [radar.worker_correlator()
+                                                  for _ in range(workers - 1)]
+        
+        # Warm-up: reference spectra and scratch buffers exist before run()
+        for correlator in self._correlators:
+            correlator.correlate_fft(self._discard, complex_output=True,
+                                     out=self._profiles[0])
+        
+        self._stop = threading.Event()
+        self.reset()
+    
+    def reset(self):
+        """Clear counters, histograms and queues"""
+        self.counters = dict.fromkeys(
+            ('captured', 'overruns', 'idle_waits', 'underruns', 'processed',
+             'consumed'), 0)
+        self.latency = {stage: LatencyHistogram(stage) for stage in self.STAGES}
+        self.avg_profile[:] = 0
+        self.elapsed = 0.0
+        
+        self._free = queue.Queue()
+        for slot in range(self.num_buffers):
+            self._free.put(slot)
+        self._full = queue.Queue()
+        self._done = queue.Queue()
+        self._lock = threading.Lock()
+        self._error = None
+        self._stop.clear()
+    
+    def stop(self):
+        """Ask the capture thread to finish (queued CPIs are still processed)"""
+        self._stop.set()
+    
+    #-------------------------------------------------------------------------
+    # Stages
+    #-------------------------------------------------------------------------
+    
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+    
+    def _capture_loop(self, num_cpis):
+        """
+        Read CPIs into free slots; drop (overrun) when none is free
+        
+        EOFError from the source ends the stream; any other exception is
+        kept for run() to re-raise. Either way the workers are released.
+        Read k is due one CPI period after read k-1 (schedule anchored at
+        the first read); completing a period past that is an underrun.
+        """
+        seq = 0
+        reads = 0
+        period = 1.0 / self.cpi_rate if self.cpi_rate else None
+        t_first = None
+        
+        try:
+            while not self._stop.is_set() and (num_cpis is None or reads < num_cpis):
+                try:
+                    slot = self._free.get_nowait()
+                except queue.Empty:
+                    slot = None
+                
+                start = time.perf_counter()
+                if t_first is None:
+                    t_first = start
+                try:
+                    self.source(self._discard if slot is None else self._rx[slot])
+                except EOFError:
+                    break
+                t_captured = time.perf_counter()
+                self.latency['capture'].record(t_captured - start)
+                reads += 1
+                self._count('captured')
+                if period and t_captured > t_first + (reads + 1) * period:
+                    self._count('underruns')
+                
+                if slot is None:
+                    self._count('overruns')
+                    continue
+                
+                self._t_captured[slot] = t_captured
+                self._full.put((seq, slot))
+                seq += 1
+        except Exception as exc:
+            self._error = exc
+        finally:
+            for _ in range(self.num_workers):
+                self._full.put(None)
+    
+    def _worker_loop(self, correlator):
+        """Correlate captured slots into their profile buffers"""
+        while True:
+            if self._full.empty() and self.counters['captured']:
+                self._count('idle_waits')
+            
+            item = self._full.get()
+            if item is None:
+                self._done.put(None)
+                return
+            
+            seq, slot = item
+            start = time.perf_counter()
+            self.latency['queue'].record(start - self._t_captured[slot])
+            
+            correlator.correlate_fft(self._rx[slot], complex_output=True,
+                                     out=self._profiles[slot])
+            
+            self.latency['process'].record(time.perf_counter() - start)
+            self._count('processed')
+            self._done.put((seq, slot))
+    
+    def _consumer_loop(self):
+        """Consume profiles in capture order, then free their slots"""
+        radar = self.radar
+        pending = {}
+        next_seq = 0
+        workers_left = self.num_workers
+        
+        while workers_left:
+            item = self._done.get()
+            if item is None:
+                workers_left -= 1
+                continue
+            
+            pending[item[0]] = item[1]
+            while next_seq in pending:
+                slot = pending.pop(next_seq)
+                start = time.perf_counter()
+                
+                profile = self._profiles[slot]
+                radar.range_doppler.push(profile)
+                
+                # Running mean: avg += (|profile| - avg) / (k + 1)
+                range_profile = self._range_profile
+                np.abs(profile, out=range_profile)
+                np.subtract(range_profile, self.avg_profile, out=self._delta)
+                self._delta /= next_seq + 1
+                self.avg_profile += self._delta
+                
+                if self.consumer:
+                    self.consumer(next_seq, range_profile, radar.detect(range_profile))
+                if self.rd_callback and radar.range_doppler.ready:
+                    self.rd_callback(next_seq, radar.range_doppler.compute())
+                
+                end = time.perf_counter()
+                self.latency['consume'].record(end - start)
+                self.latency['end_to_end'].record(end - self._t_captured[slot])
+                self._count('consumed')
+                
+                self._free.put(slot)
+                next_seq += 1
+    
+    #-------------------------------------------------------------------------
+    # Run
+    #-------------------------------------------------------------------------
+    
+    def run(self, num_cpis=None):
+        """
+        Run the pipeline until num_cpis CPIs were read or stop() is called
+        
+        The run also ends when the source raises EOFError (e.g. an
+        exhausted IQReplay).
+        
+        Args:
+            num_cpis: Source reads (captured + dropped), None = until stop()
+        
+        Returns:
+            stats() dict
+        
+        Raises:
+            Any other exception raised by the source, once the CPIs
+            already captured have been consumed
+        """
+        self.reset()
+        
+        threads = [threading.Thread(target=self._capture_loop, args=(num_cpis,),
+                                    name='cpi-capture', daemon=True)]
+        threads += [threading.Thread(target=self._worker_loop, args=(corr,),
+                                     name=f'cpi-worker-{i}', daemon=True)
+                    for i, corr in enumerate(self._correlators)]
+        threads.append(threading.Thread(target=self._consumer_loop,
+                                        name='cpi-consumer', daemon=True))
+        
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=0.1)
+        except KeyboardInterrupt:
+            self.stop()
+            for thread in threads:
+                thread.join()
+        self.elapsed = time.perf_counter() - start
+        
+        if self._error is not None:
+            raise self._error
+        
+        return self.stats()
+    
+    def rd_map(self):
+        """Copy of the current range-Doppler map, or None before it is full"""
+        rd = self.radar.range_doppler
+        return rd.compute().copy() if rd.ready else None
+    
+    def stats(self):
+        """Counters, throughput and per-stage latency summaries"""
+        stats = dict(self.counters)
+        stats['elapsed'] = self.elapsed
+        stats['cpi_rate'] = self.counters['consumed'] / self.elapsed if self.elapsed else 0.0
+        stats['latency'] = {name: hist.summary() for name, hist in self.latency.items()}
+        return stats
+    
+    def print_stats(self):
+        """Print counters and latency table"""
+        s = self.stats()
+        print(f"[Pipeline] {s['captured']} captured, {s['consumed']} consumed, "
+              f"{s['overruns']} overruns, {s['underruns']} underruns, "
+              f"{s['idle_waits']} idle waits, "
+              f"{s['cpi_rate']:.1f} CPI/s")
+        print(f"  {'Stage':<11} {'Count':>6} {'Mean':>9} {'p50':>9} {'p99':>9} {'Max':>9}")
+        for name, h in s['latency'].items():
+            print(f"  {name:<11} {h['count']:>6} " +
+                  " ".join(f"{h[k] * 1e3:>7.2f}ms" for k in ('mean', 'p50', 'p99', 'max')))
+
+#=============================================================================
+# Benchmark
+#=============================================================================
+
+def benchmark_pipeline(radar=None, num_cpis=200, worker_counts=(1, 2)):
+    """
+    Serial CPI loop vs pipeline, simulated source at full load
+    
+    The unpaced source outruns processing, so the pipeline rows also
+    show how many CPIs were dropped.
+    
+    Returns:
+        Dict {'serial' / 'pipeline-<workers>': consumed CPI/s}
+    """
+    if radar is None:
+        from pluto_radar import PlutoRadar
+        radar = PlutoRadar()
+    
+    results = {}
+    print(f"\n[Benchmark] CPI pipeline ({num_cpis} CPIs, "
+          f"{radar.config.CPI_LENGTH} samples, unpaced simulated source)")
+    
+    radar.run_cpi_loop(num_cpis=2)
+    start = time.perf_counter()
+    radar.run_cpi_loop(num_cpis=num_cpis)
+    results['serial'] = num_cpis / (time.perf_counter() - start)
+    dropped = {'serial': 0}
+    
+    for workers in worker_counts:
+        pipeline = CPIPipeline(radar, source=SimulatedSource(radar).read, workers=workers)
+        stats = pipeline.run(num_cpis)
+        results[f'pipeline-{workers}'] = stats['cpi_rate']
+        dropped[f'pipeline-{workers}'] = stats['overruns']
+        pipeline.print_stats()
+    
+    for label, rate in results.items():
+        print(f"  {label:<12} {rate:>8.1f} CPI/s ({dropped[label]} dropped)")
+    
+    return results
+
+if __name__ == "__main__":
+    benchmark_pipeline()
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+QEDMMA PoC - IQ Recording and Replay
+Raw capture files with JSON sidecar, memory-mapped replay source
+
+Author: Dr. Mladen Mešter
+Copyright (c) 2026 - All Rights Reserved
+
+A recording is two files:
+
+    capture.iq        raw samples, no header
+                        'complex64' - interleaved float32 I/Q
+                        'sc16'      - interleaved int16 I/Q (bladeRF SC16_Q11)
+    capture.iq.json   metadata: format, scale, center_freq, sample_rate,
+                      prbs_order, cpi_length, num_samples and one
+                      [sample_offset, num_samples, unix_time] entry per
+                      captured block
+
+Blocks are written straight from the caller's array (contiguous arrays
+go to the file without a copy). IQReplay memory-maps the data file and
+hands out views into the page cache, so a complex64 replay feeds the
+CPI loop without copying; SC16 replays convert into a reused buffer.
+"""
+
+import numpy as np
+import json
+import os
+import time
+
+from scratch_pool import ScratchPool
+from sc16 import SC16_SCALE, complex_to_sc16, sc16_to_complex
+
+IQ_FORMATS = ('complex64', 'sc16')
+
+#=============================================================================
+# Recorder
+#=============================================================================
+
+class IQRecorder:
+    """
+    Stream capture blocks to a raw IQ file plus JSON sidecar
+    
+    Usable as a context manager; the sidecar is written on close().
+    """
+    
+    def __init__(self, path, fmt='complex64', center_freq=None, sample_rate=None,
+                 prbs_order=None, cpi_length=None, **metadata):
+        """
+        Open a recording
+        
+        Args:
+            path: Data file path (sidecar: path + '.json')
+            fmt: 'complex64' or 'sc16'
+            center_freq: RF centre frequency in Hz
+            sample_rate: Sample rate in Hz
+            prbs_order: PRBS order of the TX code
+            cpi_length: Samples per CPI (replay block size)
+            **metadata: Extra JSON-serializable fields
+        """
+        if fmt not in IQ_FORMATS:
+            raise ValueError(f"Unknown IQ format '{fmt}', choose from {IQ_FORMATS}")
+        
+        self.path = path
+        self.fmt = fmt
+        self.metadata = {
+            'format': fmt,
+            'scale': SC16_SCALE if fmt == 'sc16' else 1.0,
+            'center_freq': center_freq,
+            'sample_rate': sample_rate,
+            'prbs_order': prbs_order,
+            'cpi_length': cpi_length,
+            'start_time': time.time(),
+            **metadata,
+        }
+        self.captures = []
+        self.num_samples = 0
+        self.scratch = ScratchPool()
+        self._file = open(path, 'wb')
+    
+    @classmethod
+    def from_config(cls, path, config, fmt='complex64', **metadata):
+        """Recorder with metadata taken from a RadarConfig / BladeRFConfig"""
+        return cls(path, fmt,
+                   center_freq=config.CENTER_FREQ,
+                   sample_rate=config.SAMPLE_RATE,
+                   prbs_order=config.PRBS_ORDER,
+                   cpi_length=config.CPI_LENGTH,
+                   **metadata)
+    
+    def write(self, samples, timestamp=None):
+        """
+        Append one capture block
+        
+        Args:
+            samples: Complex samples, or for 'sc16' also raw interleaved
+                     int16 I/Q (written as-is)
+            timestamp: Capture time (default: now, unix seconds)
+        """
+        samples = np.asarray(samples)
+        
+        if self.fmt == 'complex64':
+            block = np.ascontiguousarray(samples, dtype=np.complex64)
+            count = len(block)
+        elif samples.dtype == np.int16:
+            block = np.ascontiguousarray(samples)
+            count = block.size // 2
+        else:
+            count = len(samples)
+            block = complex_to_sc16(samples, out=self.scratch.get('sc16', 2 * count, np.int16),
+                                    scratch=self.scratch.get('sc16_float', 2 * count, np.float32))
+        
+        self._file.write(memoryview(block).cast('B'))
+        self.captures.append([self.num_samples, count,
+                              time.time() if timestamp is None else timestamp])
+        self.num_samples += count
+    
+    def tap(self, capture):
+        """
+        Wrap a capture function so every block it returns is recorded
+        
+        Args:
+            capture: e.g. PlutoRadar.capture_cpi or BladeRFRadar.receive
+        
+        Returns:
+            Function with the same signature and return value
+        """
+        def recorded(*args, **kwargs):
+            samples = capture(*args, **kwargs)
+            self.write(samples)
+            return samples
+        return recorded
+    
+    def close(self):
+        """Flush data and write the sidecar"""
+        if self._file.closed:
+            return
+        self._file.close()
+        
+        metadata = dict(self.metadata, num_samples=self.num_samples, captures=self.captures)
+        with open(self.path + '.json', 'w') as f:
+            json.dump(metadata, f, indent=2)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+def record_cpis(capture, path, num_cpis, config, fmt='complex64', **metadata):
+    """
+    Record num_cpis blocks from a capture function
+    
+    Args:
+        capture: Function returning one block (e.g. radar.capture_cpi)
+        path: Data file path
+        num_cpis: Blocks to record
+        config: RadarConfig / BladeRFConfig for the metadata
+        fmt: 'complex64' or 'sc16'
+    
+    Returns:
+        Sidecar metadata dict
+    """
+    with IQRecorder.from_config(path, config, fmt, **metadata) as recorder:
+        for _ in range(num_cpis):
+            recorder.write(capture())
+    
+    print(f"[IQRecorder] {num_cpis} CPIs, {recorder.num_samples} samples -> {path}")
+    return load_metadata(path)
+
+def load_metadata(path):
+    """Sidecar metadata of a recording"""
+    with open(path + '.json') as f:
+        return json.load(f)
+
+#=============================================================================
+# Replay Source
+#=============================================================================
+
+class IQReplay:
+    """
+    Memory-mapped replay of a recording, one CPI per read()
+    
+    read() with no out returns a read-only view into the mapped file
+    (complex64) - no copy is made. With out, or for 'sc16', the block
+    is converted into out / a reused buffer. With realtime=True blocks
+    are released on an absolute schedule at the recorded sample rate
+    (line rate); otherwise as fast as they are read.
+    """
+    
+    def __init__(self, path, cpi_length=None, realtime=False, loop=False):
+        """
+        Open a recording
+        
+        Args:
+            path: Data file path (sidecar must exist)
+            cpi_length: Samples per read (default: recorded cpi_length)
+            realtime: Pace reads at the recorded sample rate
+            loop: Wrap to the start instead of raising EOFError
+        """
+        self.metadata = load_metadata(path)
+        self.fmt = self.metadata['format']
+        self.scale = self.metadata['scale']
+        self.sample_rate = self.metadata['sample_rate']
+        self.cpi_length = cpi_length or self.metadata['cpi_length']
+        if not self.cpi_length:
+            raise ValueError("No cpi_length given or recorded")
+        if realtime and not self.sample_rate:
+            raise ValueError("Realtime replay needs a recorded sample_rate")
+        
+        if self.fmt == 'complex64':
+            self.data = np.memmap(path, dtype=np.complex64, mode='r')
+        else:
+            self.data = np.memmap(path, dtype=np.int16, mode='r').reshape(-1, 2)
+        
+        self.realtime = realtime
+        self.loop = loop
+        self.scratch = ScratchPool()
+        self.rewind()
+    
+    @property
+    def num_cpis(self):
+        """Whole CPIs in the recording"""
+        return len(self.data) // self.cpi_length
+    
+    def rewind(self):
+        """Restart at the first CPI"""
+        self.cpi_index = 0
+        self._next = None
+    
+    def _pace(self):
+        """Sleep until the current block would have arrived"""
+        now = time.perf_counter()
+        if self._next is None:
+            self._next = now
+        self._next += self.cpi_length / self.sample_rate
+        if self._next > now:
+            time.sleep(self._next - now)
+    
+    def read(self, out=None):
+        """
+        Next CPI of the recording
+        
+        Args:
+            out: Optional complex buffer of cpi_length samples to fill
+        
+        Returns:
+            complex64 samples (a view into the file when possible)
+        """
+        if self.cpi_index >= self.num_cpis:
+            if not self.loop or not self.num_cpis:
+                raise EOFError(f"Replay exhausted after {self.cpi_index} CPIs")
+            self.cpi_index = 0
+        
+        if self.realtime:
+            self._pace()
+        
+        start = self.cpi_index * self.cpi_length
+        block = self.data[start:start + self.cpi_length]
+        self.cpi_index += 1
+        
+        if self.fmt == 'complex64':
+            if out is None:
+                return block
+            np.copyto(out, block)
+            return out
+        
+        if out is None:
+            out = self.scratch.get('replay', self.cpi_length, np.complex64)
+        return sc16_to_complex(block, out, self.scale)
+    
+    def __iter__(self):
+        """Iterate over the remaining CPIs (views, see read)"""
+        while self.cpi_index < self.num_cpis:
+            yield self.read()
+
+#=============================================================================
+# Benchmark
+#=============================================================================
+
+def benchmark_replay(num_cpis=64, cpi_length=32768):
+    """
+    Record / replay throughput for both formats (temporary files)
+    
+    Replay touches every sample of every block (sum over the view).
+    
+    Returns:
+        Dict {format: (record MS/s, replay MS/s)}
+    """
+    import tempfile
+    
+    results = {}
+    rng = np.random.default_rng(0)
+    block = (rng.standard_normal(cpi_length) + 1j * rng.standard_normal(cpi_length)) * 0.1
+    block = block.astype(np.complex64)
+    total = num_cpis * cpi_length / 1e6
+    
+    print(f"\n[Benchmark] IQ record / replay ({num_cpis} x {cpi_length} samples)")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in IQ_FORMATS:
+            path = os.path.join(tmp, f'bench_{fmt}.iq')
+            
+            start = time.perf_counter()
+            with IQRecorder(path, fmt, cpi_length=cpi_length) as recorder:
+                for _ in range(num_cpis):
+                    recorder.write(block)
+            t_record = time.perf_counter() - start
+            
+            replay = IQReplay(path)
+            start = time.perf_counter()
+            acc = 0.0
+            for samples in replay:
+                acc += float(samples.view(np.float32).sum())
+            t_replay = time.perf_counter() - start
+            
+            results[fmt] = (total / t_record, total / t_replay)
+            print(f"  {fmt:<10} record {results[fmt][0]:>8.1f} MS/s, "
+                  f"replay {results[fmt][1]:>8.1f} MS/s")
+            del replay
+    
+    return results
+
+if __name__ == "__main__":
+    benchmark_replay()
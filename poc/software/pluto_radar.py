@@ -13,6 +13,9 @@ Usage:
     python3 pluto_radar.py --mode loopback   # Self-test
     python3 pluto_radar.py --mode monostatic # Single antenna
     python3 pluto_radar.py --mode bistatic   # Tx/Rx separated
+    python3 pluto_radar.py --mode monostatic --pipeline  # Threaded pipeline
+    python3 pluto_radar.py --record cap.iq --cpis 200    # Record raw IQ
+    python3 pluto_radar.py --replay cap.iq               # Process a recording
 """
 
 import numpy as np
@@ -21,6 +24,11 @@ import time
 import argparse
 import sys
 
+from prbs_library import PRBS_TAPS, prbs_bits, lfsr_jump
+from range_doppler import RangeDopplerProcessor
+from scratch_pool import ScratchPool, fft_into, ifft_into
+from scenario import ScenarioGenerator, Target
+
 try:
     import adi
     PLUTO_AVAILABLE = True
@@ -51,10 +59,20 @@ class RadarConfig:
     CPI_LENGTH = 32768       # Samples per CPI
     NUM_CPIS = 100           # For averaging
     
+    # Slow-time (range-Doppler) parameters
+    DOPPLER_BINS = 64        # CPIs per Doppler FFT
+    DOPPLER_WINDOW = 'hann'  # Slow-time taper
+    CLUTTER_NOTCH = None     # Doppler bins zeroed each side of DC (None = off)
+    
+    # Simulation (no hardware)
+    SIM_NOISE_POWER = 0.01   # Complex noise power per sample
+    SIM_SEED = None          # Scenario seed (None = fresh entropy)
+    
     # Derived parameters
     CHIPS_PER_SAMPLE = CHIP_RATE / SAMPLE_RATE
     RANGE_RESOLUTION = 3e8 / (2 * CHIP_RATE)  # meters
     MAX_RANGE = RANGE_RESOLUTION * NUM_RANGE_BINS
+    CPI_RATE = SAMPLE_RATE / CPI_LENGTH       # CPIs/s
     
     @classmethod
     def print_config(cls):
@@ -78,21 +96,14 @@ class PRBSGenerator:
     """PRBS-N sequence generator using LFSR"""
     
     # LFSR taps for different PRBS orders (maximal length)
-    TAPS = {
-        7:  [7, 6],
-        9:  [9, 5],
-        11: [11, 9],
-        15: [15, 14],
-        20: [20, 17],
-        23: [23, 18],
-    }
+    TAPS = PRBS_TAPS
     
     def __init__(self, order=15, seed=None):
         """
         Initialize PRBS generator
         
         Args:
-            order: PRBS order (7, 9, 11, 15, 20, 23)
+            order: PRBS order (2-32)
             seed: Initial LFSR state (default: all ones)
         """
         if order not in self.TAPS:
@@ -103,18 +114,19 @@ class PRBSGenerator:
         self.length = 2**order - 1
         
         if seed is None:
-            self.state = (1 << order) - 1  # All ones
+            self.seed = (1 << order) - 1  # All ones
         else:
-            self.state = seed & ((1 << order) - 1)
-            if self.state == 0:
-                self.state = 1  # Avoid all-zeros lock
+            self.seed = seed & ((1 << order) - 1)
+            if self.seed == 0:
+                self.seed = 1  # Avoid all-zeros lock
+        self.state = self.seed
     
     def next_bit(self):
-        """Generate next PRBS bit"""
+        """Generate next PRBS bit (same convention as prbs_library)"""
         # Calculate feedback
         feedback = 0
         for tap in self.taps:
-            feedback ^= (self.state >> (tap - 1)) & 1
+            feedback ^= (self.state >> (self.order - tap)) & 1
         
         # Output bit (LSB)
         output = self.state & 1
@@ -125,17 +137,13 @@ class PRBSGenerator:
         return output
     
     def generate_sequence(self, length=None):
-        """Generate PRBS sequence as numpy array"""
+        """Generate PRBS sequence as numpy array (from the shared cache)"""
         if length is None:
             length = self.length
         
-        # Reset state
-        self.state = (1 << self.order) - 1
-        
-        # Generate bits
-        bits = np.zeros(length, dtype=np.int8)
-        for i in range(length):
-            bits[i] = self.next_bit()
+        # Reset state, then leave it where next_bit() would have
+        bits = prbs_bits(self.order, length, seed=self.seed).astype(np.int8)
+        self.state = lfsr_jump(self.seed, length, self.order)
         
         return bits
     
@@ -146,7 +154,7 @@ class PRBSGenerator:
         Args:
             samples_per_chip: Oversampling factor
             amplitude: Signal amplitude (0-1)
-            
+        
         Returns:
             Complex IQ samples
         """
@@ -201,6 +209,10 @@ class ZeroDSPCorrelator:
         # Pre-compute BPSK symbols for reference
         self.prbs_bpsk = 2 * self.prbs_ref - 1  # +1 or -1
         
+        # conj(FFT(ref)) per FFT length, and reusable FFT work arrays
+        self._ref_spectra = {}
+        self.scratch = ScratchPool()
+        
         print(f"[Correlator] Initialized: PRBS-{prbs_order}, {num_lanes} lanes")
         print(f"[Correlator] Processing gain: {10*np.log10(self.prbs_length):.1f} dB")
     
@@ -213,7 +225,7 @@ class ZeroDSPCorrelator:
         
         Args:
             rx_samples: Complex received samples
-            
+        
         Returns:
             Range profile (correlation magnitude vs delay)
         """
@@ -262,31 +274,53 @@ class ZeroDSPCorrelator:
         
         return np.abs(accumulators)
     
-    def correlate_fft(self, rx_samples):
+    def reference_spectrum(self, n):
+        """Cached conj(FFT) of the zero-padded BPSK reference (length n)"""
+        spectrum = self._ref_spectra.get(n)
+        if spectrum is None:
+            ref_padded = np.zeros(n, dtype=np.complex64)
+            ref_padded[:self.prbs_length] = self.prbs_bpsk
+            spectrum = np.conj(np.fft.fft(ref_padded))
+            self._ref_spectra[n] = spectrum
+        return spectrum
+    
+    def correlate_fft(self, rx_samples, complex_output=False, out=None):
         """
         FFT-based correlation (fast, for comparison)
         
         Uses circular cross-correlation via FFT.
         Mathematically equivalent to zero-DSP but much faster in Python.
+        The padded block and spectrum live in the scratch pool and the
+        reference spectrum is cached, so with out= a CPI allocates nothing.
+        
+        Args:
+            rx_samples: Complex RX samples
+            complex_output: Return the complex profile (keeps phase for
+                            slow-time processing) instead of magnitude
+            out: Optional [num_lanes] output array (complex64 when
+                 complex_output, else float32)
         """
         # Ensure same length
         n = max(len(rx_samples), self.prbs_length)
         
-        # Pad signals
-        rx_padded = np.zeros(n, dtype=np.complex64)
+        # Pad signal
+        rx_padded = self.scratch.get('rx_padded', n, np.complex64)
         rx_padded[:len(rx_samples)] = rx_samples
+        rx_padded[len(rx_samples):] = 0
         
-        ref_padded = np.zeros(n, dtype=np.complex64)
-        ref_padded[:self.prbs_length] = self.prbs_bpsk
-        
-        # FFT correlation
-        rx_fft = np.fft.fft(rx_padded)
-        ref_fft = np.fft.fft(ref_padded)
-        
-        correlation = np.fft.ifft(rx_fft * np.conj(ref_fft))
+        # FFT correlation (in place after the forward transform)
+        spectrum = fft_into(rx_padded, self.scratch.get('spectrum', n, np.complex64))
+        spectrum *= self.reference_spectrum(n)
+        correlation = ifft_into(spectrum, spectrum)
         
         # Return first num_lanes bins (range profile)
-        return np.abs(correlation[:self.num_lanes])
+        lags = correlation[:self.num_lanes]
+        if complex_output:
+            if out is None:
+                return lags.copy()
+            np.copyto(out, lags)
+            return out
+        return np.abs(lags, out=out)
 
 #=============================================================================
 # PlutoSDR Interface
@@ -295,13 +329,15 @@ class ZeroDSPCorrelator:
 class PlutoRadar:
     """PlutoSDR Radar Interface"""
     
-    def __init__(self, uri="ip:192.168.2.1", config=RadarConfig):
+    def __init__(self, uri="ip:192.168.2.1", config=RadarConfig, scenario=None):
         """
         Initialize PlutoSDR radar
         
         Args:
             uri: PlutoSDR URI (default: ip:192.168.2.1)
             config: Radar configuration class
+            scenario: Optional ScenarioGenerator for simulation mode
+                      (default: default_scenario())
         """
         self.config = config
         self.uri = uri
@@ -323,6 +359,43 @@ class PlutoRadar:
         )
         
         print(f"[PlutoRadar] TX waveform: {len(self.tx_waveform)} samples")
+        
+        # Coherent slow-time stage (fixed-size ring of complex profiles)
+        self.range_doppler = RangeDopplerProcessor(
+            num_lanes=config.NUM_RANGE_BINS,
+            num_cpis=config.DOPPLER_BINS,
+            window=config.DOPPLER_WINDOW,
+            clutter_notch=config.CLUTTER_NOTCH
+        )
+        
+        # Per-CPI work arrays (simulated RX, profiles) and simulated scene
+        self.scratch = ScratchPool()
+        self.scenario = scenario if scenario is not None else self.default_scenario()
+        
+        # Optional sample source replacing the SDR, e.g. IQReplay.read
+        self.source = None
+    
+    def default_scenario(self, seed=None):
+        """
+        Two steady targets (delays 100 and 300, amplitudes 0.5 and 0.2)
+        
+        The stream is simulated at the correlator's rate, one sample per
+        PRBS chip, with the cyclic PRBS restarting at every CPI (the code
+        alignment correlate_fft assumes).
+        """
+        return ScenarioGenerator(
+            self.correlator.prbs_bpsk,
+            self.config.SAMPLE_RATE,
+            targets=[Target(100, amplitude=0.5), Target(300, amplitude=0.2)],
+            noise_power=self.config.SIM_NOISE_POWER,
+            block_sync=True,
+            seed=self.config.SIM_SEED if seed is None else seed
+        )
+    
+    @property
+    def allocations(self):
+        """Scratch buffers allocated by radar + correlator (flat in steady state)"""
+        return self.scratch.allocations + self.correlator.scratch.allocations
     
     def connect(self):
         """Connect to PlutoSDR"""
@@ -353,7 +426,7 @@ class PlutoRadar:
             print(f"  Sample Rate: {self.sdr.sample_rate/1e6:.1f} MSPS")
             
             return True
-            
+        
         except Exception as e:
             print(f"[PlutoRadar] Connection failed: {e}")
             return False
@@ -375,90 +448,173 @@ class PlutoRadar:
             self.sdr.tx_destroy_buffer()
             print("[PlutoRadar] TX stopped")
     
-    def capture_cpi(self):
-        """Capture one CPI of RX samples"""
+    def capture_cpi(self, out=None):
+        """
+        Capture one CPI of RX samples
+        
+        Args:
+            out: Optional [CPI_LENGTH] complex64 buffer to fill
+        """
+        if self.source is not None:
+            return self.source(out)
+        
         if self.sdr is None:
             # Simulation mode - generate synthetic data
-            return self._simulate_rx()
-        
-        return self.sdr.rx()
-    
-    def _simulate_rx(self):
-        """Generate simulated RX data for testing"""
-        n_samples = self.config.CPI_LENGTH
-        
-        # Add delayed copies of TX waveform (simulated targets)
-        rx = np.zeros(n_samples, dtype=np.complex64)
-        
-        # Target 1: Delay 100 samples, amplitude 0.5
-        delay1 = 100
-        amp1 = 0.5
-        tx_len = len(self.tx_waveform)
-        if delay1 + tx_len <= n_samples:
-            rx[delay1:delay1+tx_len] += amp1 * self.tx_waveform
-        
-        # Target 2: Delay 300 samples, amplitude 0.2
-        delay2 = 300
-        amp2 = 0.2
-        if delay2 + tx_len <= n_samples:
-            rx[delay2:delay2+tx_len] += amp2 * self.tx_waveform
-        
-        # Add noise
-        noise_power = 0.01
-        noise = np.sqrt(noise_power/2) * (
-            np.random.randn(n_samples) + 1j * np.random.randn(n_samples)
-        )
-        rx += noise.astype(np.complex64)
+            return self._simulate_rx(out=out)
+        
+        if out is None:
+            return self.sdr.rx()
+        np.copyto(out, self.sdr.rx())
+        return out
+    
+    def _simulate_rx(self, out=None):
+        """
+        Generate simulated RX data for testing (next block of self.scenario)
+        
+        Without out, the returned buffer is reused by the next call -
+        copy to keep it.
+        """
+        if out is None:
+            out = self.scratch.get('sim_rx', self.config.CPI_LENGTH, np.complex64)
         
-        return rx
+        return self.scenario.generate(out)
     
-    def process_cpi(self, rx_samples):
+    def process_cpi(self, rx_samples, complex_output=False, out=None):
         """
         Process one CPI
         
         Args:
             rx_samples: Complex RX samples
-            
+            complex_output: Return the complex profile instead of magnitude
+            out: Optional output array (see ZeroDSPCorrelator.correlate_fft)
+        
         Returns:
             Range profile (magnitude vs range bin)
         """
         # Use FFT correlation (fast)
-        range_profile = self.correlator.correlate_fft(rx_samples)
+        range_profile = self.correlator.correlate_fft(rx_samples, complex_output, out=out)
         
         return range_profile
     
-    def run_cpi_loop(self, num_cpis=100, callback=None):
+    def worker_correlator(self):
+        """Extra correlator (own scratch pool) for a pipeline worker thread"""
+        return ZeroDSPCorrelator(
+            prbs_order=self.config.PRBS_ORDER,
+            num_lanes=self.config.NUM_RANGE_BINS
+        )
+    
+    def detect(self, range_profile, max_peaks=5):
+        """
+        Threshold detections in a magnitude range profile
+        
+        Args:
+            range_profile: Magnitude vs range bin
+            max_peaks: Maximum detections returned (lowest bins first)
+        
+        Returns:
+            List of (range_bin, range_m, snr_db)
+        """
+        noise_floor = np.median(range_profile)
+        peaks = np.flatnonzero(range_profile > noise_floor * 10)[:max_peaks]
+        
+        return [(int(idx), idx * self.config.RANGE_RESOLUTION,
+                 20 * np.log10(range_profile[idx] / noise_floor)) for idx in peaks]
+    
+    def run_pipeline(self, num_cpis=None, workers=1, num_buffers=4,
+                     consumer=None, rd_callback=None, source=None):
+        """
+        Run the pipelined capture / process / consume mode
+        
+        Capture, correlation and consumption run in separate threads over
+        a ring of num_buffers preallocated CPI slots (see cpi_pipeline).
+        
+        Args:
+            num_cpis: CPIs to read (None = until Ctrl+C)
+            workers: Correlation worker threads
+            num_buffers: CPI slots in the ring
+            consumer: Optional callback(cpi_idx, range_profile, detections)
+            rd_callback: Optional callback(cpi_idx, rd_map)
+            source: Optional source(out); default self.source, else
+                    capture_cpi, or without hardware a SimulatedSource
+                    paced at CPI_RATE
+        
+        Returns:
+            (avg_profile, rd_map, stats) - see run_cpi_loop and
+            CPIPipeline.stats
+        """
+        from cpi_pipeline import CPIPipeline, SimulatedSource
+        
+        source = source or self.source
+        if source is None and self.sdr is None:
+            source = SimulatedSource(self, rate=self.config.CPI_RATE).read
+        
+        print(f"\n[PlutoRadar] Starting CPI pipeline ({workers} workers, "
+              f"{num_buffers} buffers)...")
+        
+        pipeline = CPIPipeline(self, source=source, num_buffers=num_buffers,
+                               workers=workers, consumer=consumer,
+                               rd_callback=rd_callback)
+        stats = pipeline.run(num_cpis)
+        pipeline.print_stats()
+        
+        return pipeline.avg_profile, pipeline.rd_map(), stats
+    
+    def run_cpi_loop(self, num_cpis=100, callback=None, rd_callback=None):
         """
         Run continuous CPI processing loop
         
+        Complex profiles go into the range-Doppler ring buffer; the
+        magnitude average is kept as a running mean, so memory does not
+        grow with num_cpis. Every per-CPI array comes from the scratch
+        pools - after the first CPI, allocations stays constant.
+        
         Args:
             num_cpis: Number of CPIs to process
             callback: Optional callback function(cpi_idx, range_profile)
+                      (range_profile is reused - copy to keep it)
+            rd_callback: Optional callback function(cpi_idx, rd_map), called
+                         every CPI once DOPPLER_BINS CPIs are buffered
+                         (rd_map is reused - copy to keep it)
+        
+        Returns:
+            (avg_profile, rd_map) - rd_map is [DOPPLER_BINS, NUM_RANGE_BINS]
+            or None if fewer than DOPPLER_BINS CPIs were processed
         """
         print(f"\n[PlutoRadar] Starting CPI loop ({num_cpis} CPIs)...")
         
-        range_profiles = []
+        num_bins = self.config.NUM_RANGE_BINS
+        avg_profile = np.zeros(num_bins)
+        profile = self.scratch.get('profile', num_bins, np.complex64)
+        range_profile = self.scratch.get('range_profile', num_bins, np.float32)
+        delta = self.scratch.get('avg_delta', num_bins, np.float64)
         
         for cpi_idx in range(num_cpis):
             # Capture
             rx_samples = self.capture_cpi()
             
-            # Process
-            range_profile = self.process_cpi(rx_samples)
-            range_profiles.append(range_profile)
+            # Process (complex, phase kept for the Doppler FFT)
+            self.process_cpi(rx_samples, complex_output=True, out=profile)
+            self.range_doppler.push(profile)
+            
+            # Running mean: avg += (|profile| - avg) / (k + 1)
+            np.abs(profile, out=range_profile)
+            np.subtract(range_profile, avg_profile, out=delta)
+            delta /= cpi_idx + 1
+            avg_profile += delta
             
-            # Callback
+            # Callbacks
             if callback:
                 callback(cpi_idx, range_profile)
+            if rd_callback and self.range_doppler.ready:
+                rd_callback(cpi_idx, self.range_doppler.compute())
             
             # Progress
             if (cpi_idx + 1) % 10 == 0:
                 print(f"  CPI {cpi_idx + 1}/{num_cpis}")
         
-        # Average across CPIs
-        avg_profile = np.mean(range_profiles, axis=0)
+        rd_map = self.range_doppler.compute().copy() if self.range_doppler.ready else None
         
-        return avg_profile, range_profiles
+        return avg_profile, rd_map
 
 #=============================================================================
 # Main Application
@@ -506,8 +662,15 @@ def run_loopback_test():
     
     return None
 
-def run_radar_mode(mode="monostatic"):
-    """Run radar in specified mode"""
+def run_radar_mode(mode="monostatic", pipelined=False, workers=2):
+    """
+    Run radar in specified mode
+    
+    Args:
+        mode: Operating mode name
+        pipelined: Capture and process concurrently (see run_pipeline)
+        workers: Correlation threads in pipelined mode
+    """
     print("\n" + "=" * 60)
     print(f"RADAR MODE: {mode.upper()}")
     print("=" * 60)
@@ -520,41 +683,102 @@ def run_radar_mode(mode="monostatic"):
         radar.start_tx()
         time.sleep(0.5)
         
+        def report(cpi_idx, range_profile, detections):
+            for peak_idx, range_m, snr in detections:
+                print(f"[CPI {cpi_idx + 1}] Detection: bin={peak_idx}, "
+                      f"range={range_m:.0f}m, SNR={snr:.1f}dB")
+        
         try:
             print("\nPress Ctrl+C to stop...\n")
+            
+            if pipelined:
+                radar.run_pipeline(workers=workers, consumer=report)
+                return
+            
             cpi_count = 0
             
             while True:
                 rx_samples = radar.capture_cpi()
                 range_profile = radar.process_cpi(rx_samples)
                 
-                # Find peaks
-                threshold = np.median(range_profile) * 10
-                peaks = np.where(range_profile > threshold)[0]
-                
+                report(cpi_count, range_profile, radar.detect(range_profile))
                 cpi_count += 1
                 
-                if len(peaks) > 0:
-                    for peak_idx in peaks[:5]:  # Top 5 peaks
-                        range_m = peak_idx * RadarConfig.RANGE_RESOLUTION
-                        snr = 20 * np.log10(range_profile[peak_idx] / np.median(range_profile))
-                        print(f"[CPI {cpi_count}] Detection: bin={peak_idx}, "
-                              f"range={range_m:.0f}m, SNR={snr:.1f}dB")
-                
                 time.sleep(0.1)
-                
+        
         except KeyboardInterrupt:
             print("\nStopping...")
         
         finally:
             radar.stop_tx()
 
+def run_record(path, num_cpis=100, fmt='complex64'):
+    """Record raw CPIs (hardware, or the simulated scenario) to path"""
+    from iq_recorder import record_cpis
+    
+    radar = PlutoRadar()
+    
+    if radar.connect():
+        radar.start_tx()
+        time.sleep(0.5)
+        try:
+            return record_cpis(radar.capture_cpi, path, num_cpis, radar.config, fmt,
+                               uri=radar.uri, simulated=radar.sdr is None)
+        finally:
+            radar.stop_tx()
+
+def run_replay(path, num_cpis=None, realtime=False):
+    """
+    Run the CPI loop on a recording instead of the SDR
+    
+    Args:
+        path: Recording (see iq_recorder)
+        num_cpis: CPIs to process (default: whole recording)
+        realtime: Replay at the recorded sample rate
+    
+    Returns:
+        (avg_profile, rd_map) from run_cpi_loop
+    """
+    from iq_recorder import IQReplay
+    
+    replay = IQReplay(path, cpi_length=RadarConfig.CPI_LENGTH, realtime=realtime)
+    meta = replay.metadata
+    print(f"[Replay] {path}: {replay.num_cpis} CPIs, {meta['format']}, "
+          f"{(meta['sample_rate'] or 0) / 1e6:.1f} MSPS, PRBS-{meta['prbs_order']}")
+    
+    radar = PlutoRadar()
+    radar.source = replay.read
+    
+    num_cpis = replay.num_cpis if num_cpis is None else num_cpis
+    start = time.perf_counter()
+    avg_profile, rd_map = radar.run_cpi_loop(num_cpis=num_cpis)
+    elapsed = time.perf_counter() - start
+    
+    print(f"[Replay] {num_cpis} CPIs in {elapsed:.2f} s ({num_cpis / elapsed:.1f} CPI/s), "
+          f"peak bin {np.argmax(avg_profile)}")
+    
+    return avg_profile, rd_map
+
 def main():
     parser = argparse.ArgumentParser(description="QEDMMA PoC Radar")
     parser.add_argument("--mode", choices=["loopback", "monostatic", "bistatic", "sim"],
                        default="sim", help="Operating mode")
     parser.add_argument("--uri", default="ip:192.168.2.1",
                        help="PlutoSDR URI")
+    parser.add_argument("--pipeline", action="store_true",
+                       help="Capture and process concurrently")
+    parser.add_argument("--workers", type=int, default=2,
+                       help="Correlation threads with --pipeline")
+    parser.add_argument("--record", metavar="PATH",
+                       help="Record raw CPIs to PATH (+ PATH.json)")
+    parser.add_argument("--replay", metavar="PATH",
+                       help="Process a recording instead of the SDR")
+    parser.add_argument("--cpis", type=int, default=None,
+                       help="CPIs to record / replay")
+    parser.add_argument("--format", choices=["complex64", "sc16"], default="complex64",
+                       help="Sample format for --record")
+    parser.add_argument("--realtime", action="store_true",
+                       help="Replay at the recorded sample rate")
     args = parser.parse_args()
     
     print("\n" + "=" * 60)
@@ -562,14 +786,18 @@ def main():
     print("Author: Dr. Mladen Mešter")
     print("=" * 60)
     
-    if args.mode == "loopback":
+    if args.record:
+        run_record(args.record, args.cpis or 100, args.format)
+    elif args.replay:
+        run_replay(args.replay, args.cpis, args.realtime)
+    elif args.mode == "loopback":
         run_loopback_test()
     elif args.mode == "sim":
         # Simulation mode
         print("\nRunning in SIMULATION mode (no hardware)")
         run_loopback_test()
     else:
-        run_radar_mode(args.mode)
+        run_radar_mode(args.mode, pipelined=args.pipeline, workers=args.workers)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+QEDMMA PoC - PRBS / m-Sequence Code Library
+One cached source of PRBS codes for the correlators, radios and benches
+
+Author: Dr. Mladen Mešter
+Copyright (c) 2026 - All Rights Reserved
+
+LFSR convention (Fibonacci, right shift):
+    output   = state & 1
+    feedback = XOR of state bit (order - tap) for every tap
+    state    = (state >> 1) | (feedback << (order - 1))
+    
+    so the output obeys a[j] = XOR_tap a[j - tap], and the first `order`
+    output bits are the seed bits LSB first. Taps (15, 14) therefore give
+    the m-sequence of x^15 + x^14 + 1.
+
+Generation is word-parallel: squaring the feedback polynomial over GF(2)
+gives a[j] = XOR_tap a[j - 2^k * tap], so each numpy XOR produces
+2^k * min(taps) bits at once. Arbitrary offsets are reached with GF(2)
+matrix jump-ahead in O(order^2 * log offset). Full periods are cached
+as read-only memory-mapped .npy files keyed by (order, taps, seed).
+"""
+
+import numpy as np
+import os
+import time
+import tempfile
+
+# Maximal-length taps (primitive trinomials, pentanomials where none exists)
+PRBS_TAPS = {
+    2:  (2, 1),
+    3:  (3, 2),
+    4:  (4, 3),
+    5:  (5, 3),
+    6:  (6, 5),
+    7:  (7, 6),
+    8:  (8, 6, 5, 4),
+    9:  (9, 5),
+    10: (10, 7),
+    11: (11, 9),
+    12: (12, 11, 8, 6),
+    13: (13, 4, 3, 1),
+    14: (14, 5, 3, 1),
+    15: (15, 14),
+    16: (16, 15, 13, 4),
+    17: (17, 14),
+    18: (18, 11),
+    19: (19, 6, 2, 1),
+    20: (20, 17),
+    21: (21, 19),
+    22: (22, 21),
+    23: (23, 18),
+    24: (24, 23, 22, 17),
+    25: (25, 22),
+    26: (26, 6, 2, 1),
+    27: (27, 5, 2, 1),
+    28: (28, 25),
+    29: (29, 27),
+    30: (30, 6, 4, 1),
+    31: (31, 28),
+    32: (32, 22, 2, 1),
+}
+
+# Cache directory (override with QEDMMA_PRBS_CACHE, '' disables the disk cache)
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'qedmma', 'prbs')
+
+# Largest order whose full period is generated / cached (PRBS-31 is 2 GB)
+MAX_CACHED_ORDER = 25
+
+_CODE_CACHE = {}
+
+#=============================================================================
+# LFSR State Algebra (GF(2))
+#=============================================================================
+
+def _resolve(order, taps, seed):
+    """Validate and normalize (order, taps, seed)"""
+    if taps is None:
+        if order not in PRBS_TAPS:
+            raise ValueError(f"No default taps for PRBS order {order}, "
+                             f"choose from {sorted(PRBS_TAPS)} or pass taps")
+        taps = PRBS_TAPS[order]
+    taps = tuple(sorted({int(t) for t in taps}, reverse=True))
+    if taps[0] != order or taps[-1] < 1:
+        raise ValueError(f"Taps {taps} must lie in [1, {order}] and include {order}")
+    
+    mask = (1 << order) - 1
+    seed = mask if seed is None else int(seed) & mask
+    if seed == 0:
+        raise ValueError("LFSR seed must be non-zero")
+    
+    return order, taps, seed
+
+def lfsr_step_matrix(order, taps):
+    """
+    One-step LFSR transition as GF(2) matrix columns
+    
+    Column i is the next state of basis state 1 << i, so the next state
+    of s is the XOR of the columns selected by the set bits of s.
+    """
+    columns = []
+    for i in range(order):
+        feedback = int(any(order - t == i for t in taps))
+        columns.append(((1 << i) >> 1) | (feedback << (order - 1)))
+    return columns
+
+def _apply(columns, state):
+    """Matrix-vector product over GF(2)"""
+    out = 0
+    i = 0
+    while state:
+        if state & 1:
+            out ^= columns[i]
+        state >>= 1
+        i += 1
+    return out
+
+def _compose(a, b):
+    """Matrix product a @ b over GF(2) (apply b first)"""
+    return [_apply(a, col) for col in b]
+
+def lfsr_jump(state, steps, order, taps=None):
+    """
+    Advance an LFSR state by `steps` clocks in O(order^2 * log steps)
+    
+    Args:
+        state: Current state (non-zero)
+        steps: Number of clocks (reduced modulo the period 2^order - 1)
+        order: LFSR length
+        taps: Feedback taps (default: PRBS_TAPS[order])
+    
+    Returns:
+        State after `steps` clocks
+    """
+    order, taps, state = _resolve(order, taps, state)
+    steps = int(steps) % ((1 << order) - 1)
+    
+    power = lfsr_step_matrix(order, taps)
+    while steps:
+        if steps & 1:
+            state = _apply(power, state)
+        steps >>= 1
+        if steps:
+            power = _compose(power, power)
+    
+    return state
+
+#=============================================================================
+# Word-Parallel Generation
+#=============================================================================
+
+def _generate(order, taps, state, length):
+    """
+    Generate `length` output bits starting from `state`
+    
+    The first `order` bits are the state itself; the rest are filled by
+    doubling the recurrence lag so every XOR covers a growing block.
+    """
+    bits = np.empty(max(length, order), dtype=np.uint8)
+    bits[:order] = (state >> np.arange(order)) & 1
+    
+    filled = order
+    t_min = taps[-1]
+    scale = 1
+    while filled < length:
+        while 2 * scale * order <= filled:
+            scale *= 2
+        chunk = min(scale * t_min, length - filled)
+        out = bits[filled:filled + chunk]
+        
+        lag = scale * taps[0]
+        out[:] = bits[filled - lag:filled - lag + chunk]
+        for t in taps[1:]:
+            lag = scale * t
+            out ^= bits[filled - lag:filled - lag + chunk]
+        filled += chunk
+    
+    return bits[:length]
+
+def prbs_segment(order, offset, length, seed=None, taps=None):
+    """
+    Generate chips [offset, offset + length) without the full period
+    
+    Uses jump-ahead to reach `offset`, so cost is O(log offset + length).
+    Offsets beyond the period wrap.
+    
+    Returns:
+        uint8 array of {0, 1}
+    """
+    order, taps, seed = _resolve(order, taps, seed)
+    state = lfsr_jump(seed, offset, order, taps)
+    return _generate(order, taps, state, int(length))
+
+#=============================================================================
+# Cached Codes
+#=============================================================================
+
+def _cache_path(cache_dir, order, taps, seed):
+    name = f"prbs{order}_t{'-'.join(map(str, taps))}_s{seed:x}.npy"
+    return os.path.join(cache_dir, name)
+
+def _load_or_generate(order, taps, seed, cache_dir):
+    """Full period from the .npy cache, generated and stored on a miss"""
+    period = (1 << order) - 1
+    path = _cache_path(cache_dir, order, taps, seed) if cache_dir else None
+    
+    if path and os.path.exists(path):
+        try:
+            bits = np.load(path, mmap_mode='r')
+            if bits.shape == (period,) and bits.dtype == np.uint8:
+                return bits
+        except (OSError, ValueError):
+            pass
+    
+    bits = _generate(order, taps, seed, period)
+    
+    if path:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, bits)
+            os.replace(tmp, path)
+            return np.load(path, mmap_mode='r')
+        except OSError as e:
+            print(f"Warning: PRBS cache {cache_dir} not writable ({e}), using memory")
+    
+    bits.flags.writeable = False
+    return bits
+
+class PRBSCode:
+    """
+    One full-period m-sequence with bit, BPSK and bit-packed views
+    
+    Views are read-only and shared; copy before modifying.
+    """
+    
+    def __init__(self, order, taps=None, seed=None, cache_dir=None):
+        """
+        Args:
+            order: LFSR length
+            taps: Feedback taps (default: PRBS_TAPS[order])
+            seed: Initial state (default: all ones)
+            cache_dir: .npy cache directory ('' disables, default:
+                       $QEDMMA_PRBS_CACHE or ~/.cache/qedmma/prbs)
+        """
+        self.order, self.taps, self.seed = _resolve(order, taps, seed)
+        if self.order > MAX_CACHED_ORDER:
+            raise ValueError(f"Full period of PRBS-{order} too large, use prbs_segment()")
+        
+        if cache_dir is None:
+            cache_dir = os.environ.get('QEDMMA_PRBS_CACHE', DEFAULT_CACHE_DIR)
+        
+        self.length = (1 << self.order) - 1
+        self.bits = _load_or_generate(self.order, self.taps, self.seed, cache_dir)
+        self._views = {}
+    
+    def bpsk(self, dtype=np.float64):
+        """Chips as +/-1 (bit 1 -> +1, bit 0 -> -1)"""
+        key = ('bpsk', np.dtype(dtype))
+        if key not in self._views:
+            view = (2 * self.bits.astype(dtype) - 1)
+            view.flags.writeable = False
+            self._views[key] = view
+        return self._views[key]
+    
+    def packed(self):
+        """Chips packed into little-endian uint64 words (bit i -> word i // 64)"""
+        if 'packed' not in self._views:
+            packed = np.packbits(self.bits, bitorder='little')
+            words = np.zeros(-(-len(packed) // 8) * 8, dtype=np.uint8)
+            words[:len(packed)] = packed
+            view = words.view('<u8')
+            view.flags.writeable = False
+            self._views['packed'] = view
+        return self._views['packed']
+    
+    def chips(self, length=None, offset=0):
+        """
+        Bits [offset, offset + length), wrapping around the period
+        
+        Returns a view when the range does not wrap.
+        """
+        length = self.length if length is None else int(length)
+        offset = int(offset) % self.length
+        if offset + length <= self.length:
+            return self.bits[offset:offset + length]
+        return np.take(self.bits, np.arange(offset, offset + length), mode='wrap')
+    
+    def state_at(self, offset):
+        """LFSR state after `offset` clocks"""
+        return lfsr_jump(self.seed, offset, self.order, self.taps)
+
+def get_prbs(order, taps=None, seed=None, cache_dir=None):
+    """
+    Shared PRBSCode for (order, taps, seed), generated once per process
+    
+    Returns:
+        PRBSCode
+    """
+    order, taps, seed = _resolve(order, taps, seed)
+    key = (order, taps, seed)
+    if key not in _CODE_CACHE:
+        _CODE_CACHE[key] = PRBSCode(order, taps, seed, cache_dir)
+    return _CODE_CACHE[key]
+
+def prbs_bits(order, length=None, offset=0, seed=None, taps=None):
+    """
+    {0, 1} chips of the cached m-sequence (read-only)
+    
+    Args:
+        order: LFSR length
+        length: Number of chips (default: one period)
+        offset: First chip index (wraps)
+        seed: Initial state (default: all ones)
+        taps: Feedback taps (default: PRBS_TAPS[order])
+    """
+    if order > MAX_CACHED_ORDER:
+        period = (1 << order) - 1
+        return prbs_segment(order, offset, period if length is None else length, seed, taps)
+    return get_prbs(order, taps, seed).chips(length, offset)
+
+def prbs_bpsk(order, seed=None, taps=None, dtype=np.float64):
+    """One period as +/-1 chips (read-only)"""
+    return get_prbs(order, taps, seed).bpsk(dtype)
+
+#=============================================================================
+# Code Families (multistatic node separation)
+#=============================================================================
+
+def decimate(bits, q):
+    """Sequence decimation v[i] = u[q*i mod N]"""
+    n = len(bits)
+    return np.asarray(bits)[(q * np.arange(n, dtype=np.int64)) % n]
+
+def gold_codes(order, count=None, seed=None):
+    """
+    Gold code family from a preferred pair of m-sequences
+    
+    The pair is u = prbs_bits(order) and v = u decimated by q = 2^k + 1
+    (k = 1 for odd order, k = 2 for order = 2 mod 4). Codes are
+    [u, v, u ^ v, u ^ (v << 1), ...], 2^order + 1 in total, with the
+    three-valued cross-correlation {-1, -t, t - 2},
+    t = 2^((order + 2) // 2) + 1.
+    
+    Args:
+        order: LFSR length (not a multiple of 4)
+        count: Number of codes to return (default: all)
+        seed: Seed of u (default: all ones)
+        
+    Returns:
+        [count, 2^order - 1] uint8 array of {0, 1}
+    """
+    if order % 4 == 0:
+        raise ValueError(f"No preferred pair exists for order {order} (multiple of 4)")
+    
+    u = prbs_bits(order, seed=seed)
+    v = decimate(u, 3 if order % 2 else 5)
+    total = len(u) + 2
+    count = total if count is None else min(int(count), total)
+    
+    codes = np.empty((count, len(u)), dtype=np.uint8)
+    codes[:min(count, 2)] = np.stack([u, v])[:count]
+    for k in range(count - 2):
+        np.bitwise_xor(u, np.roll(v, -k), out=codes[k + 2])
+    
+    return codes
+
+def kasami_codes(order, count=None, seed=None):
+    """
+    Small-set Kasami code family (even order)
+    
+    w = u decimated by 2^(order/2) + 1 has period 2^(order/2) - 1;
+    codes are [u, u ^ w, u ^ (w << 1), ...], 2^(order/2) in total, with
+    peak cross-correlation 2^(order/2) + 1 (optimal, Welch bound).
+    
+    Args:
+        order: Even LFSR length
+        count: Number of codes to return (default: all)
+        seed: Seed of u (default: all ones)
+        
+    Returns:
+        [count, 2^order - 1] uint8 array of {0, 1}
+    """
+    if order % 2:
+        raise ValueError(f"Small Kasami set needs an even order, got {order}")
+    
+    u = prbs_bits(order, seed=seed)
+    w = decimate(u, (1 << order // 2) + 1)
+    total = 1 << order // 2
+    count = total if count is None else min(int(count), total)
+    
+    codes = np.empty((count, len(u)), dtype=np.uint8)
+    codes[0] = u
+    for k in range(count - 1):
+        np.bitwise_xor(u, np.roll(w, -k), out=codes[k + 1])
+    
+    return codes
+
+#=============================================================================
+# Benchmark
+#=============================================================================
+
+def _bit_serial(order, taps, state, length):
+    """Per-bit Python LFSR (the pre-library generators), for benchmarking"""
+    bits = np.zeros(length, dtype=np.uint8)
+    for i in range(length):
+        bits[i] = state & 1
+        feedback = 0
+        for t in taps:
+            feedback ^= (state >> (order - t)) & 1
+        state = (state >> 1) | (feedback << (order - 1))
+    return bits
+
+def benchmark_prbs(orders=(15, 20, 23)):
+    """
+    Bit-serial vs word-parallel generation vs cached load
+    
+    Bit-serial time is measured on 2^15 chips and scaled to the period.
+    
+    Returns:
+        Dict {order: (bit_serial_ms, generate_ms, cached_ms)}
+    """
+    results = {}
+    
+    print("\n[Benchmark] PRBS generation")
+    print(f"  {'Order':>5} {'Chips':>11} {'Bit-serial':>11} {'Generate':>10} "
+          f"{'Cached':>10} {'Jump P/2':>10}")
+    
+    for order in orders:
+        order, taps, seed = _resolve(order, None, None)
+        period = (1 << order) - 1
+        
+        n_serial = min(period, 1 << 15)
+        start = time.perf_counter()
+        _bit_serial(order, taps, seed, n_serial)
+        t_serial = (time.perf_counter() - start) * 1e3 * period / n_serial
+        
+        start = time.perf_counter()
+        _generate(order, taps, seed, period)
+        t_gen = (time.perf_counter() - start) * 1e3
+        
+        get_prbs(order)
+        start = time.perf_counter()
+        np.asarray(get_prbs(order).bits).sum()
+        t_cached = (time.perf_counter() - start) * 1e3
+        
+        start = time.perf_counter()
+        lfsr_jump(seed, period // 2, order, taps)
+        t_jump = (time.perf_counter() - start) * 1e3
+        
+        results[order] = (t_serial, t_gen, t_cached)
+        print(f"  {order:>5} {period:>11,} {t_serial:>9.0f}ms {t_gen:>8.1f}ms "
+              f"{t_cached:>8.1f}ms {t_jump:>8.2f}ms")
+    
+    return results
+
+if __name__ == "__main__":
+    benchmark_prbs()
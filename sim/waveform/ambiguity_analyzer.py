@@ -8,10 +8,16 @@ Copyright (c) 2026 - All Rights Reserved
 """
 
 import numpy as np
+import os
+import sys
 from dataclasses import dataclass
 from typing import Dict, List
 from enum import IntEnum
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', '..', 'poc', 'software'))
+from prbs_library import prbs_bpsk
+
 C_LIGHT = 299_792_458  # m/s
 
 class PRBSType(IntEnum):
@@ -26,25 +32,10 @@ PRBS_TAPS = {
 }
 
 def generate_prbs(prbs_type: PRBSType, seed: int = 1) -> np.ndarray:
-    """Generate maximal-length PRBS sequence as ±1 values."""
+    """Generate maximal-length PRBS sequence as ±1 values (shared PRBS library)."""
     n = int(prbs_type)
-    length = (1 << n) - 1
-    taps = PRBS_TAPS[prbs_type]
-    
-    lfsr = seed & ((1 << n) - 1)
-    if lfsr == 0:
-        lfsr = 1
-    
-    sequence = np.zeros(length, dtype=np.float64)
-    
-    for i in range(length):
-        sequence[i] = (lfsr & 1) * 2 - 1
-        feedback = 0
-        for tap in taps:
-            feedback ^= (lfsr >> (tap - 1)) & 1
-        lfsr = ((lfsr >> 1) | (feedback << (n - 1))) & ((1 << n) - 1)
-    
-    return sequence
+    seed = (seed & ((1 << n) - 1)) or 1
+    return prbs_bpsk(n, seed=seed, taps=PRBS_TAPS[prbs_type]).copy()
 
 def verify_prbs_autocorrelation(prbs_type: PRBSType) -> Dict:
     """
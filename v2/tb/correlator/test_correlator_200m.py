@@ -15,6 +15,12 @@ from cocotb.triggers import RisingEdge, Timer, ClockCycles
 from cocotb.result import TestFailure
 import numpy as np
 import random
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', '..', '..', 'poc', 'software'))
+from prbs_library import prbs_bits
 
 # PRBS-11 parameters
 PRBS11_POLY = 0x401  # x^11 + x^2 + 1
@@ -25,27 +31,8 @@ PRBS15_POLY = 0x6000  # x^15 + x^14 + 1
 PRBS15_LEN = 32767
 
 def generate_prbs(length, poly_taps, seed=0x7FF):
-    """Generate PRBS sequence."""
-    lfsr = seed
-    sequence = []
-    
-    # Determine LFSR length from polynomial
-    lfsr_len = max(poly_taps)
-    mask = (1 << lfsr_len) - 1
-    
-    for _ in range(length):
-        # Output is LSB
-        sequence.append(lfsr & 1)
-        
-        # Feedback calculation
-        feedback = 0
-        for tap in poly_taps:
-            feedback ^= (lfsr >> (tap - 1)) & 1
-        
-        # Shift and insert feedback
-        lfsr = ((lfsr >> 1) | (feedback << (lfsr_len - 1))) & mask
-    
-    return np.array(sequence)
+    """Generate PRBS sequence (shared PRBS library, output LSB first)."""
+    return prbs_bits(max(poly_taps), length, seed=seed, taps=poly_taps).astype(np.int64)
 
 def prbs_to_bpsk(prbs):
     """Convert PRBS (0/1) to BPSK (+1/-1)."""
@@ -6,13 +6,16 @@ Copyright (c) 2026 - All Rights Reserved
 """
 
 import numpy as np
-from scipy import signal
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', '..', '..', 'poc', 'software'))
+from prbs_library import prbs_bits
 
 def generate_mls(n):
-    """Generate Maximum Length Sequence using scipy."""
-    # scipy.signal.max_len_seq generates proper m-sequence
-    seq, _ = signal.max_len_seq(n)
-    return seq
+    """Generate Maximum Length Sequence from the shared PRBS library."""
+    return prbs_bits(n).astype(np.int64)
 
 def prbs_to_bpsk(prbs):
     """Convert PRBS (0/1) to BPSK (+1/-1)."""